@@ -0,0 +1,56 @@
+"""
+The slideshow pipeline as an importable package.
+
+    import _tools as slides
+
+    deck = slides.create('notes.md', 'my-presentation')
+    slides.synthesize(deck, concurrency=8)
+    slides.render(deck)
+    slides.build_all()
+    slides.preview('my-presentation')
+
+Everything runs in the calling process, so a batch job can work through
+many decks while sharing the audio cache, keep-alive TTS connections and
+a rate limiter (pass the same cache= and limiter= to each synthesize()).
+
+The functions are imported on first use, so importing the package (and
+starting the command-line tools) stays cheap. The tools import each other
+as top-level modules because they also run as scripts, so this directory
+is added to sys.path.
+"""
+
+import sys
+import importlib
+from pathlib import Path
+
+_TOOLS_DIR = Path(__file__).parent
+if str(_TOOLS_DIR) not in sys.path:
+    sys.path.insert(0, str(_TOOLS_DIR))
+
+# Public name -> (module, attribute)
+_EXPORTS = {
+    'create': ('create_slideshow', 'create_deck'),
+    'transform': ('create_slideshow', 'transform_content_to_json'),
+    'render': ('build_all', 'build_deck'),
+    'build_all': ('build_all', 'build_all'),
+    'synthesize': ('generate_audio', 'synthesize'),
+    'preview': ('preview_slideshow', 'serve'),
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    if module_name == 'preview_slideshow' and str(_TOOLS_DIR.parent) not in sys.path:
+        sys.path.append(str(_TOOLS_DIR.parent))
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Content hashes of the published site, and what changed since the last publish.
+
+The site is the root index.html plus every file under the top-level
+directories that don't start with '_' or '.' (the decks, assets/ and
+search/), minus hidden files such as audio journals. artifacts.json at the
+repository root records each file's size and SHA-256 as of the last
+publish, so a deploy can move exactly the files whose content changed.
+It describes the deployed site rather than the source tree, so git
+ignores it, and only --record after a real deploy updates it:
+
+    python _tools/artifacts.py            # what changed since the last publish
+    python _tools/artifacts.py --list     # added and changed paths, one per line
+    python _tools/artifacts.py --json     # added, changed and removed, as JSON
+    python _tools/artifacts.py --record   # mark the current files as published
+
+e.g. `rsync --files-from=<(python _tools/artifacts.py --list) . host:site/`.
+
+The generators only rewrite a file when its content changes (see
+fileio.atomic_write's if_changed), so a rebuild with nothing to do leaves
+the diff empty. Hashes are cached in _cache/artifact_hashes.json by size
+and mtime, so checking a collection with lots of audio stays fast.
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from fileio import atomic_write, file_digest
+
+BASE_PATH = Path(__file__).parent.parent
+MANIFEST_PATH = BASE_PATH / 'artifacts.json'
+HASH_CACHE_PATH = BASE_PATH / '_cache' / 'artifact_hashes.json'
+
+ROOT_FILES = ('index.html',)
+
+
+def iter_artifacts(base_path=BASE_PATH):
+    """Relative POSIX paths of every published file, sorted."""
+    base_path = Path(base_path)
+    paths = [name for name in ROOT_FILES if (base_path / name).is_file()]
+    for top in base_path.iterdir():
+        if not top.is_dir() or top.name.startswith(('_', '.')):
+            continue
+        for directory, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if not d.startswith(('_', '.'))]
+            for filename in filenames:
+                if not filename.startswith('.'):
+                    paths.append((Path(directory) / filename).relative_to(base_path).as_posix())
+    return sorted(paths)
+
+
+def load_json(path, default):
+    if not Path(path).exists():
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def current_artifacts(base_path=BASE_PATH, cache_path=HASH_CACHE_PATH):
+    """{path: {'bytes', 'sha256'}} for the files as they are now."""
+    base_path = Path(base_path)
+    cached = load_json(cache_path, {})
+    hashes = {}
+    artifacts = {}
+    for path in iter_artifacts(base_path):
+        stat = (base_path / path).stat()
+        stamp = [stat.st_size, stat.st_mtime_ns]
+        entry = cached.get(path)
+        if entry and entry[:2] == stamp:
+            digest = entry[2]
+        else:
+            digest = file_digest(base_path / path)
+        hashes[path] = stamp + [digest]
+        artifacts[path] = {'bytes': stat.st_size, 'sha256': digest}
+    if hashes != cached:
+        with atomic_write(cache_path) as f:
+            json.dump(hashes, f, separators=(',', ':'))
+    return artifacts
+
+
+def diff_artifacts(published, current):
+    """Paths added, changed and removed between two artifact maps."""
+    return {
+        'added': sorted(path for path in current if path not in published),
+        'changed': sorted(path for path in current
+                          if path in published and published[path]['sha256'] != current[path]['sha256']),
+        'removed': sorted(path for path in published if path not in current),
+    }
+
+
+def load_published(manifest_path=MANIFEST_PATH):
+    return load_json(manifest_path, {'files': {}})['files']
+
+
+def has_published(manifest_path=MANIFEST_PATH):
+    return Path(manifest_path).exists()
+
+
+def changes_since_publish(base_path=BASE_PATH, manifest_path=MANIFEST_PATH):
+    """Return (diff, current artifacts) against the last recorded publish."""
+    current = current_artifacts(base_path)
+    return diff_artifacts(load_published(manifest_path), current), current
+
+
+def record_publish(current, manifest_path=MANIFEST_PATH):
+    """Write current as the published set. Sorted and without timestamps, so it only changes with the site."""
+    with atomic_write(manifest_path, if_changed=True) as f:
+        json.dump({'files': dict(sorted(current.items()))}, f, indent=1)
+        f.write('\n')
+
+
+def format_size(size):
+    return f"{size / 1024 / 1024:.1f} MB" if size >= 1024 * 1024 else f"{size / 1024:.0f} KB"
+
+
+def change_summary(diff):
+    """e.g. '3 added, 1 changed, 2 removed', or None when nothing differs."""
+    counts = [f"{len(diff[key])} {key}" for key in ('added', 'changed', 'removed') if diff[key]]
+    return ', '.join(counts) or None
+
+
+def print_changes(diff, current):
+    moved = diff['added'] + diff['changed']
+    size = sum(current[path]['bytes'] for path in moved)
+    summary = change_summary(diff)
+    if not summary:
+        print(f"✅ All {len(current)} artifacts match the last publish")
+        return
+    print(f"📦 Since the last publish: {summary} ({format_size(size)} to upload):")
+    for sign, key in (('+', 'added'), ('~', 'changed'), ('-', 'removed')):
+        for path in diff[key]:
+            print(f"   {sign} {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='List site files that changed since the last publish')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--list', action='store_true', help='Print added and changed paths only, one per line')
+    mode.add_argument('--json', action='store_true', help='Print added, changed and removed paths as JSON')
+    mode.add_argument('--record', action='store_true', help='Record the current files as published')
+    args = parser.parse_args(argv)
+
+    diff, current = changes_since_publish()
+    if args.record:
+        record_publish(current)
+        print(f"📌 Recorded {len(current)} artifacts as published in {MANIFEST_PATH.name}")
+    elif args.list:
+        for path in diff['added'] + diff['changed']:
+            print(path)
+    elif args.json:
+        json.dump(diff, sys.stdout, indent=2)
+        print()
+    else:
+        print_changes(diff, current)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
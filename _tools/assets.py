@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Split-asset build mode for slideshow HTML.
+
+Instead of inlining the template's CSS, player JS and deck data into every
+index.html, this mode emits:
+- the shared CSS and JS once, under content-hashed names in assets/
+- each deck's data as compact JSON under a content-hashed name
+- a small HTML shell that links the CSS, fetches the data and then runs
+  the player
+and writes precompressed .gz (and .br, when the brotli package is
+installed) siblings for each file, so hosts that support it can serve
+them without compressing on the fly. Hashed names never change content,
+so browsers can cache them indefinitely across the whole collection.
+"""
+
+import os
+import re
+import gzip
+import json
+import hashlib
+import threading
+from pathlib import Path
+
+from fileio import atomic_write
+from template_engine import Template
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_PATH = Path(__file__).parent.parent
+ASSETS_DIR = BASE_PATH / 'assets'
+
+# Marker identifying a deck page built in split-asset mode
+SPLIT_MARKER = '<meta name="slides-build" content="split-assets">'
+
+STYLE_PATTERN = re.compile(r'[ \t]*<style>\n?(.*?)[ \t]*</style>\n', re.DOTALL)
+SCRIPT_PATTERN = re.compile(r'[ \t]*<script>\n?(.*?)[ \t]*</script>\n', re.DOTALL)
+DATA_LINE = 'let slideshowData = {{SLIDESHOW_DATA}};'
+
+LOADER = """    <link rel="preload" href="{{JS_URL}}" as="script">
+    <script>
+        // Fetch the deck data, then start the shared player
+        fetch('{{DATA_URL}}')
+            .then(response => response.json())
+            .then(data => {
+                window.slideshowData = data;
+                const player = document.createElement('script');
+                player.src = '{{JS_URL}}';
+                document.body.appendChild(player);
+            })
+            .catch(err => console.error('Could not load slideshow data:', err));
+    </script>
+"""
+
+_split_cache = {}
+_split_lock = threading.Lock()
+
+
+def content_hash(data, length=12):
+    return hashlib.sha256(data).hexdigest()[:length]
+
+
+def split_template(template_path):
+    """Return (shell Template, css, js) for the slideshow template, cached by mtime."""
+    template_path = Path(template_path)
+    stat = template_path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _split_lock:
+        cached = _split_cache.get(template_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+    source = template_path.read_text(encoding='utf-8')
+    style = STYLE_PATTERN.search(source)
+    script = SCRIPT_PATTERN.search(source)
+    if not style or not script or DATA_LINE not in script.group(1):
+        raise ValueError(f"{template_path} doesn't have the expected <style>/<script> layout")
+
+    css = style.group(1)
+    js = script.group(1).replace(DATA_LINE, 'let slideshowData = window.slideshowData;')
+    shell = (
+        source[:style.start()]
+        + f'    {SPLIT_MARKER}\n    <link rel="stylesheet" href="{{{{CSS_URL}}}}">\n'
+        + source[style.end():script.start()]
+        + LOADER
+        + source[script.end():]
+    )
+
+    result = (Template(shell), css, js)
+    with _split_lock:
+        _split_cache[template_path] = (stamp, result)
+    return result
+
+
+def precompress(path):
+    """Write .gz (and .br if available) siblings of path."""
+    path = Path(path)
+    data = path.read_bytes()
+    with atomic_write(path.with_name(path.name + '.gz'), binary=True, if_changed=True) as f:
+        # mtime=0 keeps the output identical for identical input
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with atomic_write(path.with_name(path.name + '.br'), binary=True, if_changed=True) as f:
+            f.write(brotli.compress(data))
+
+
+def write_hashed(directory, stem, extension, data):
+    """Write data as <stem>.<hash>.<extension> unless it already exists."""
+    path = Path(directory) / f"{stem}.{content_hash(data)}.{extension}"
+    if not path.exists():
+        with atomic_write(path, binary=True) as f:
+            f.write(data)
+        precompress(path)
+    return path
+
+
+def remove_stale(directory, pattern, keep):
+    """Delete hashed files (and their compressed siblings) that are no longer referenced."""
+    keep = {Path(path).name for path in keep}
+    for path in Path(directory).glob(pattern):
+        base = path.name
+        for suffix in ('.gz', '.br'):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base not in keep:
+            path.unlink()
+
+
+def uses_split_assets(slideshow_path):
+    """True if the deck's current index.html was built in split-asset mode."""
+    html_path = Path(slideshow_path) / 'index.html'
+    if not html_path.exists():
+        return False
+    with open(html_path, 'r', encoding='utf-8') as f:
+        return SPLIT_MARKER in f.read(2048)
+
+
+def remove_split_outputs(slideshow_path):
+    """Remove split-mode files from a deck that is being rendered inline."""
+    slideshow_path = Path(slideshow_path)
+    remove_stale(slideshow_path, 'data.*.json*', [])
+    for suffix in ('.gz', '.br'):
+        compressed = slideshow_path / f'index.html{suffix}'
+        if compressed.exists():
+            compressed.unlink()
+
+
+def shared_assets(template_path, assets_dir=ASSETS_DIR):
+    """Write the shared CSS and JS and return their paths."""
+    _, css, js = split_template(template_path)
+    css_path = write_hashed(assets_dir, 'slideshow', 'css', css.encode('utf-8'))
+    js_path = write_hashed(assets_dir, 'slideshow', 'js', js.encode('utf-8'))
+    return css_path, js_path
+
+
+def render_split(slideshow_data, slideshow_path, template_path, page_context, assets_dir=ASSETS_DIR):
+    """
+    Write a deck as an HTML shell plus hashed data, CSS and JS files.
+
+    page_context fills the shell's own placeholders (title, slide markup).
+    """
+    slideshow_path = Path(slideshow_path)
+    shell, _, _ = split_template(template_path)
+    css_path, js_path = shared_assets(template_path, assets_dir)
+
+    data = json.dumps(slideshow_data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    data_path = write_hashed(slideshow_path, 'data', 'json', data)
+    remove_stale(slideshow_path, 'data.*.json*', [data_path])
+
+    def url(path):
+        return Path(os.path.relpath(path, slideshow_path)).as_posix()
+
+    context = {
+        **page_context,
+        'CSS_URL': url(css_path),
+        'JS_URL': url(js_path),
+        'DATA_URL': url(data_path),
+    }
+    output_path = slideshow_path / 'index.html'
+    with atomic_write(output_path, if_changed=True) as f:
+        shell.render_to(f, context)
+    precompress(output_path)
+    return output_path
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for generated narration.
+
+Audio is keyed on the normalized script text, the voice and the model, so
+the same narration is only ever synthesized once no matter which deck or
+slide index it belongs to. Per-deck slide-N.mp3 files are copies of blobs
+in the store; they are never hard-linked, so editing or checking out a
+deck file cannot corrupt the store.
+
+Blobs are written atomically, so a key that exists always holds a
+complete file. The store lives in _cache/audio/ at the repository root and can be moved
+with the SLIDES_AUDIO_CACHE environment variable.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import unicodedata
+from pathlib import Path
+
+from fileio import atomic_write, remove_stale_parts
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / '_cache' / 'audio'
+
+
+def normalize_text(text):
+    """Normalize script text so cosmetic whitespace edits don't change the key."""
+    text = unicodedata.normalize('NFC', text or '')
+    return ' '.join(text.split())
+
+
+def looks_like_audio(path):
+    """Cheap sanity check that a file starts like an MP3 (ID3 tag or frame sync)."""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(3)
+    except OSError:
+        return False
+    if head == b'ID3':
+        return True
+    return len(head) >= 2 and head[0] == 0xFF and (head[1] & 0xE0) == 0xE0
+
+
+def cache_key(text, voice, model):
+    """Hash (normalized text, voice, model) into a hex cache key."""
+    payload = json.dumps([normalize_text(text), voice, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def spliced_key(keys):
+    """Key for audio spliced from the blobs of several keys, in order."""
+    payload = json.dumps(['splice', list(keys)])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Directory of audio blobs named by their cache key."""
+
+    def __init__(self, root=None):
+        root = root or os.environ.get('SLIDES_AUDIO_CACHE') or DEFAULT_CACHE_DIR
+        self.root = Path(root)
+
+    def path_for(self, key, extension='mp3'):
+        return self.root / key[:2] / f"{key}.{extension}"
+
+    def get(self, key, extension='mp3'):
+        """Return the blob path for key, or None if it isn't cached."""
+        path = self.path_for(key, extension)
+        return path if path.exists() else None
+
+    def put_bytes(self, key, data, extension='mp3'):
+        """Store raw audio bytes under key."""
+        path = self.path_for(key, extension)
+        with atomic_write(path, binary=True) as f:
+            f.write(data)
+        return path
+
+    def put_file(self, key, source, extension='mp3'):
+        """Adopt an existing audio file into the store under key."""
+        path = self.path_for(key, extension)
+        if path.exists():
+            return path
+        with atomic_write(path, binary=True) as f, open(source, 'rb') as src:
+            shutil.copyfileobj(src, f)
+        return path
+
+    def remove_stale_parts(self):
+        """Delete partial blobs left in any shard by writers that are no longer running."""
+        if not self.root.is_dir():
+            return []
+        removed = []
+        for shard in sorted(self.root.iterdir()):
+            if shard.is_dir():
+                removed += remove_stale_parts(shard)
+        return removed
+
+    def materialize(self, key, destination, extension='mp3'):
+        """Atomically copy the blob for key to destination."""
+        source = self.path_for(key, extension)
+        with atomic_write(destination, binary=True) as f, open(source, 'rb') as src:
+            shutil.copyfileobj(src, f)
+        return Path(destination)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the slideshow pipeline.
+
+Builds synthetic decks of various sizes and measures:
+- render: rendering a deck's index.html from its data
+- create: turning input notes into slideshow JSON and HTML
+- audio:  generate_audio.py against the local mock server (mock_server.py),
+          from an empty cache and again with everything cached
+
+Each workload runs in its own process so peak RSS is measured per run.
+Reported per run: wall time, throughput (slides/s), p50/p95 latency
+(per render, or per TTS request for audio) and peak RSS.
+
+Results can be saved with --json and compared against a saved run with
+--baseline; the exit status is 1 if throughput dropped by more than
+--tolerance, so a regression can be caught before it ships.
+
+Usage:
+    python _tools/benchmark.py
+    python _tools/benchmark.py --suite render --sizes 10 2000
+    python _tools/benchmark.py --suite audio --sizes 10 100 --latency 50 --rate-limit 0.02
+    python _tools/benchmark.py --json results.json
+    python _tools/benchmark.py --baseline results.json
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import contextlib
+import subprocess
+from pathlib import Path
+
+from instrumentation import percentile
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+SUITES = ('render', 'create', 'audio')
+DEFAULT_SIZES = (10, 100, 500, 2000)
+
+WORDS = (
+    "deploy pipeline latency cache team quarter roadmap customer release metric "
+    "incident review budget hiring platform service migration velocity quality "
+    "feedback launch risk scope owner design priority outcome growth support"
+).split()
+
+
+def synthetic_sentence(rng, words=12):
+    sentence = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return sentence[0].upper() + sentence[1:] + '.'
+
+
+def make_deck(directory, slides, script_words=45, seed=0):
+    """Write a slideshow_data.json with the given number of content slides."""
+    rng = random.Random(seed)
+    data = {
+        'metadata': {
+            'title': f"Benchmark Deck ({slides} slides)",
+            'subtitle': 'Synthetic data',
+            'author': '',
+            'date': '2025-01-01',
+            'category': 'Technical',
+            'duration': '1 min',
+            'voice': 'shimmer',
+            'hasAudio': False,
+            'titleScript': synthetic_sentence(rng),
+        },
+        'slides': [
+            {
+                'id': i + 1,
+                'type': 'content',
+                'title': synthetic_sentence(rng, 5).rstrip('.'),
+                'content': [synthetic_sentence(rng, 8) for _ in range(3)],
+                'script': ' '.join(synthetic_sentence(rng) for _ in range(max(1, script_words // 12))),
+            }
+            for i in range(slides)
+        ],
+    }
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'slideshow_data.json', 'w') as f:
+        json.dump(data, f, indent=2)
+    return data
+
+
+def make_notes(paragraphs, seed=0):
+    """Synthetic input notes for create_slideshow."""
+    rng = random.Random(seed)
+    return '\n\n'.join(
+        ' '.join(synthetic_sentence(rng) for _ in range(4)) for _ in range(paragraphs)
+    )
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+# --- Workloads (run in a child process) ---------------------------------------
+
+def child_render(deck, size, options):
+    from create_slideshow import generate_html
+
+    with open(Path(deck) / 'slideshow_data.json') as f:
+        data = json.load(f)
+    samples = []
+    for _ in range(options['repeat']):
+        start = time.perf_counter()
+        generate_html(data, Path(deck), split_assets=False)
+        samples.append(time.perf_counter() - start)
+    return {'seconds': sum(samples), 'items': (size + 1) * len(samples), 'samples': samples}
+
+
+def child_create(deck, size, options):
+    from create_slideshow import generate_html, transform_content_to_json
+
+    notes = make_notes(size)
+    samples = []
+    slides = 0
+    for _ in range(options['repeat']):
+        start = time.perf_counter()
+        data = transform_content_to_json(notes)
+        generate_html(data, Path(deck), split_assets=False)
+        samples.append(time.perf_counter() - start)
+        slides += len(data['slides']) + 1
+    return {'seconds': sum(samples), 'items': slides, 'samples': samples}
+
+
+def child_audio(deck, size, options):
+    import tts_client
+    import generate_audio
+
+    os.chdir(deck)
+    argv = ['--endpoint', options['endpoint'], '--rpm', '1000000', '-j', str(options['concurrency'])]
+    start = time.perf_counter()
+    status = generate_audio.main(argv)
+    seconds = time.perf_counter() - start
+    if status:
+        raise RuntimeError(f"generate_audio exited with {status}")
+    return {
+        'seconds': seconds,
+        'items': size + 1,
+        'samples': list(tts_client.get_client().latencies),
+        'requests': tts_client.get_client().stats['requests'],
+    }
+
+
+CHILD_WORKLOADS = {'render': child_render, 'create': child_create, 'audio': child_audio}
+
+
+def run_child(args):
+    """Entry point of a benchmark worker: run one workload and print its results as JSON."""
+    options = json.loads(args.options)
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = CHILD_WORKLOADS[args.child](args.deck, args.size, options)
+    result['peak_rss_mb'] = peak_rss_mb()
+    print(json.dumps(result))
+
+
+# --- Driver ---------------------------------------------------------------------
+
+def run_workload(suite, deck, size, options, env):
+    """Run a workload in a fresh process and return its results."""
+    command = [sys.executable, __file__, '--child', suite, '--deck', str(deck),
+               '--size', str(size), '--options', json.dumps(options)]
+    completed = subprocess.run(command, capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip()
+                           else f"worker exited with {completed.returncode}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def summarize(name, size, result):
+    samples = result['samples']
+    return {
+        'name': name,
+        'slides': size,
+        'seconds': round(result['seconds'], 4),
+        'throughput': round(result['items'] / result['seconds'], 1) if result['seconds'] else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 2),
+        'p95_ms': round(percentile(samples, 95) * 1000, 2),
+        'peak_rss_mb': round(result['peak_rss_mb'], 1) if result['peak_rss_mb'] else None,
+    }
+
+
+def print_row(row, baseline=None):
+    rss = f"{row['peak_rss_mb']:.1f}" if row['peak_rss_mb'] is not None else '?'
+    line = (f"{row['name']:<14} {row['slides']:>6} {row['seconds']:>9.3f} {row['throughput']:>11.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {rss:>9}")
+    if baseline:
+        change = (row['throughput'] - baseline['throughput']) / baseline['throughput'] * 100
+        line += f" {change:>+7.1f}%"
+    print(line)
+
+
+def run_benchmarks(suites, sizes, options, mock_settings):
+    from mock_server import MockSettings, serve
+
+    server = serve(MockSettings(**mock_settings))
+    endpoint = f"http://127.0.0.1:{server.server_port}/v1/audio/speech"
+    chat_endpoint = f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    tools_dir = str(Path(__file__).parent)
+
+    with tempfile.TemporaryDirectory(prefix='slides-bench-') as tmp:
+        env = dict(os.environ, OPENAI_API_KEY='mock', SLIDES_TTS_ENDPOINT=endpoint,
+                   SLIDES_LLM_ENDPOINT=chat_endpoint,
+                   PYTHONPATH=os.pathsep.join(filter(None, [tools_dir, os.environ.get('PYTHONPATH')])))
+        for suite in suites:
+            for size in sizes:
+                deck = Path(tmp) / f"{suite}-{size}"
+                make_deck(deck, size)
+                run_env = dict(env, SLIDES_AUDIO_CACHE=str(Path(tmp) / f"cache-{suite}-{size}"),
+                               SLIDES_TRANSFORM_CACHE=str(Path(tmp) / f"transform-{suite}-{size}"))
+                workload_options = dict(options, endpoint=endpoint)
+                try:
+                    result = run_workload(suite, deck, size, workload_options, run_env)
+                    yield summarize(suite, size, result)
+                    if suite == 'audio':
+                        # Second run: every clip is already cached and verified
+                        result = run_workload(suite, deck, size, workload_options, run_env)
+                        yield summarize('audio (warm)', size, result)
+                except RuntimeError as e:
+                    print(f"   ❌ {suite} with {size} slides failed: {e}")
+    server.shutdown()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark rendering, creation and audio generation offline')
+    parser.add_argument('--suite', action='append', choices=SUITES,
+                        help='Workload to run (repeatable; default: all)')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='Deck sizes in slides (default: 10 100 500 2000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions for render/create (default: 5)')
+    parser.add_argument('--concurrency', '-j', type=int, default=8,
+                        help='TTS requests in flight for the audio suite (default: 8)')
+    parser.add_argument('--latency', type=float, default=20, help='Mock server latency in ms (default: 20)')
+    parser.add_argument('--jitter', type=float, default=5, help='Mock server jitter in ms (default: 5)')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Fraction of mock requests answered with 429 (default: 0)')
+    parser.add_argument('--json', dest='json_path', help='Write results to this file')
+    parser.add_argument('--baseline', help='Compare against results saved with --json')
+    parser.add_argument('--tolerance', type=float, default=20,
+                        help='Allowed throughput drop against the baseline, in percent (default: 20)')
+    parser.add_argument('--child', choices=SUITES, help=argparse.SUPPRESS)
+    parser.add_argument('--deck', help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--options', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args)
+        return 0
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(row['name'], row['slides']): row for row in json.load(f)['results']}
+
+    suites = args.suite or list(SUITES)
+    options = {'repeat': args.repeat, 'concurrency': args.concurrency}
+    mock_settings = {'latency': args.latency / 1000, 'jitter': args.jitter / 1000,
+                     'rate_limit': args.rate_limit, 'retry_after': 0, 'seed': 1}
+
+    print(f"⏱️  Benchmarking {', '.join(suites)} on decks of {', '.join(map(str, args.sizes))} slides\n")
+    header = f"{'workload':<14} {'slides':>6} {'wall s':>9} {'slides/s':>11} {'p50 ms':>9} {'p95 ms':>9} {'RSS MB':>9}"
+    print(header + (f" {'change':>8}" if baseline else ''))
+
+    results = []
+    regressions = []
+    for row in run_benchmarks(suites, args.sizes, options, mock_settings):
+        previous = baseline.get((row['name'], row['slides']))
+        print_row(row, previous)
+        results.append(row)
+        if previous and row['throughput'] < previous['throughput'] * (1 - args.tolerance / 100):
+            regressions.append(row)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=2)
+        print(f"\n💾 Results saved to {args.json_path}")
+
+    if regressions:
+        names = ', '.join(f"{row['name']}/{row['slides']}" for row in regressions)
+        print(f"\n❌ Throughput regressed by more than {args.tolerance:g}%: {names}")
+        return 1
+    print("\n✅ Benchmark complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
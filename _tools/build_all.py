@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Rebuild every slideshow in the collection and regenerate the root index.
+
+This script:
+1. Finds every deck directory containing a slideshow_data.json
+2. Rebuilds the index.html (and offline service worker, sw.js) of decks
+   whose data, templates or page-generating code changed, several decks
+   at a time in a process pool
+3. Regenerates the card grid in the root index.html from each deck's metadata
+4. Updates the cross-deck search index in search/ (see search_index.py),
+   re-reading only decks whose data changed
+
+Outputs are only rewritten when their content changes, and the build ends
+by counting the site files that differ from the last publish (see
+artifacts.py), so a no-op rebuild gives a deploy nothing to move.
+
+Build state (a digest of each deck's inputs) is kept in
+_cache/build_state.json, so unchanged decks are skipped.
+
+With --split-assets, decks are built as small HTML shells that share
+content-hashed CSS/JS in assets/ and fetch their data as compact JSON,
+with precompressed .gz/.br siblings (see assets.py). --inline switches
+them back; without either flag each deck keeps the mode it was built with.
+
+Usage:
+    python _tools/build_all.py
+    python _tools/build_all.py --force --jobs 8
+    python _tools/build_all.py --split-assets
+    python _tools/build_all.py --inline
+"""
+
+import sys
+import json
+import html
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from artifacts import change_summary, changes_since_publish, has_published
+from fileio import atomic_write
+from search_index import find_search_decks, update_search_index
+
+BASE_PATH = Path(__file__).parent.parent
+TEMPLATE_PATH = BASE_PATH / '_templates' / 'slideshow_template.html'
+SW_TEMPLATE_PATH = BASE_PATH / '_templates' / 'service_worker.js'
+TOOLS_PATH = Path(__file__).parent
+# Modules that shape a deck's generated files; editing one rebuilds every deck
+GENERATOR_SOURCES = ('create_slideshow.py', 'slide_markup.py', 'assets.py', 'service_worker.py', 'template_engine.py')
+STATE_PATH = BASE_PATH / '_cache' / 'build_state.json'
+ROOT_INDEX = BASE_PATH / 'index.html'
+
+GRID_START = '<!-- BEGIN GENERATED SLIDESHOWS (python _tools/build_all.py) -->'
+GRID_END = '<!-- END GENERATED SLIDESHOWS -->'
+
+CATEGORY_ICONS = {
+    'Strategy': '🎯',
+    'Technical': '🛠️',
+    'Sales': '💼',
+    'Training': '📚',
+    'Update': '📣',
+}
+
+
+def find_decks(base_path=BASE_PATH):
+    """Return deck directories that contain a slideshow_data.json."""
+    decks = []
+    for data_path in sorted(Path(base_path).glob('*/slideshow_data.json')):
+        if data_path.parent.name.startswith(('_', '.')):
+            continue
+        decks.append(data_path.parent)
+    return decks
+
+
+def input_digest(deck_path, template_bytes, split_assets=False):
+    """Digest of everything a deck's index.html is generated from."""
+    digest = hashlib.sha256(template_bytes)
+    digest.update((Path(deck_path) / 'slideshow_data.json').read_bytes())
+    if split_assets:
+        digest.update(b'split-assets')
+    return digest.hexdigest()
+
+
+def read_templates():
+    """Bytes of the templates and generator code every deck's page and service worker are rendered from."""
+    sources = [TEMPLATE_PATH, SW_TEMPLATE_PATH] + [TOOLS_PATH / name for name in GENERATOR_SOURCES]
+    return b''.join(path.read_bytes() for path in sources)
+
+
+def load_state():
+    if not STATE_PATH.exists():
+        return {}
+    with open(STATE_PATH, 'r') as f:
+        return json.load(f)
+
+
+def save_state(state):
+    with atomic_write(STATE_PATH) as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def build_deck(deck_path, split_assets=None):
+    """Render one deck's index.html. Runs in a worker process."""
+    from create_slideshow import generate_html
+
+    with open(Path(deck_path) / 'slideshow_data.json', 'r') as f:
+        slideshow_data = json.load(f)
+    generate_html(slideshow_data, Path(deck_path), split_assets=split_assets)
+    return deck_path
+
+
+def rebuild_decks(decks):
+    """Render decks in this process, keeping their build mode, and record them as built."""
+    from assets import uses_split_assets
+
+    template_bytes = read_templates()
+    state = load_state()
+    for deck_path in decks:
+        split_assets = uses_split_assets(deck_path)
+        build_deck(deck_path, split_assets)
+        state[Path(deck_path).name] = input_digest(deck_path, template_bytes, split_assets)
+    save_state(state)
+
+
+def load_metadata(deck_path):
+    with open(Path(deck_path) / 'slideshow_data.json', 'r') as f:
+        slideshow_data = json.load(f)
+    return slideshow_data['metadata'], len(slideshow_data['slides'])
+
+
+def format_runtime(seconds):
+    """Measured narration length as m:ss."""
+    minutes, seconds = divmod(round(seconds), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def render_card(deck_name, metadata, slide_count):
+    """HTML for one card in the root index grid."""
+    esc = html.escape
+    category = metadata.get('category', '')
+    description = metadata.get('description') or metadata.get('subtitle', '')
+    spans = []
+    if category:
+        spans.append(f"<span>{CATEGORY_ICONS.get(category, '🏷️')} {esc(category)}</span>")
+    if metadata.get('durationSeconds'):
+        spans.append(f"<span>⏱️ {format_runtime(metadata['durationSeconds'])}</span>")
+    elif metadata.get('duration'):
+        spans.append(f"<span>⏱️ ~{esc(metadata['duration'])}</span>")
+    if metadata.get('hasAudio'):
+        spans.append("<span>🔊 Audio</span>")
+    span_html = '\n'.join(f"                        {span}" for span in spans)
+
+    return f"""            <!-- {esc(metadata['title'])} -->
+            <a href="{esc(deck_name)}/" class="slideshow-card">
+                <div class="thumbnail">
+                    <div class="slide-count">{slide_count + 1} Slides</div>
+                </div>
+                <div class="content">
+                    <h2>{esc(metadata['title'])}</h2>
+                    <p class="description">
+                        {esc(description)}
+                    </p>
+                    <div class="metadata">
+{span_html}
+                    </div>
+                </div>
+            </a>
+"""
+
+
+def update_root_index(decks=None, index_path=ROOT_INDEX):
+    """Regenerate the generated section of the root index.html card grid."""
+    decks = find_decks() if decks is None else decks
+    entries = []
+    for deck_path in decks:
+        metadata, slide_count = load_metadata(deck_path)
+        entries.append((metadata.get('date', ''), Path(deck_path).name, metadata, slide_count))
+    # Newest first, then by directory name
+    entries.sort(key=lambda e: (e[0], e[1]), reverse=True)
+    cards = '\n'.join(render_card(name, metadata, count) for _, name, metadata, count in entries)
+
+    with open(index_path, 'r') as f:
+        index_html = f.read()
+    start = index_html.find(GRID_START)
+    end = index_html.find(GRID_END)
+    if start == -1 or end == -1:
+        raise ValueError(f"Generated slideshow markers not found in {index_path}")
+
+    start += len(GRID_START)
+    updated = f"{index_html[:start]}\n{cards}            {index_html[end:]}"
+    if updated != index_html:
+        with atomic_write(index_path) as f:
+            f.write(updated)
+    return len(entries)
+
+
+def build_all(force=False, jobs=None, split_assets=None):
+    """
+    Rebuild changed decks in parallel and refresh the root index.
+
+    split_assets=None keeps each deck's current build mode.
+    """
+    from assets import uses_split_assets
+
+    decks = find_decks()
+    template_bytes = read_templates()
+    state = {} if force else load_state()
+
+    modes = {
+        deck.name: uses_split_assets(deck) if split_assets is None else split_assets
+        for deck in decks
+    }
+    digests = {deck.name: input_digest(deck, template_bytes, modes[deck.name]) for deck in decks}
+    stale = [
+        deck for deck in decks
+        if state.get(deck.name) != digests[deck.name]
+        or not (deck / 'index.html').exists() or not (deck / 'sw.js').exists()
+    ]
+
+    print(f"📚 Found {len(decks)} slideshows, {len(stale)} to rebuild")
+    failed = []
+    if stale:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = [(deck, executor.submit(build_deck, str(deck), modes[deck.name])) for deck in stale]
+            for deck, future in futures:
+                try:
+                    future.result()
+                    state[deck.name] = digests[deck.name]
+                    print(f"   ✓ Built {deck.name}/index.html")
+                except Exception as e:
+                    failed.append(deck.name)
+                    print(f"   ❌ {deck.name}: {e}")
+
+    # Forget decks that no longer exist
+    state = {name: digest for name, digest in state.items() if name in digests}
+    save_state(state)
+
+    if any(modes.values()) and not failed:
+        from assets import ASSETS_DIR, remove_stale, shared_assets
+
+        # Every split deck now references the current template's assets
+        remove_stale(ASSETS_DIR, 'slideshow.*', shared_assets(TEMPLATE_PATH))
+
+    count = update_root_index(decks)
+    print(f"📋 Root index.html lists {count} generated slideshows")
+    stats = update_search_index(find_search_decks())
+    print(f"🔎 Search index: {stats['terms']} terms in {stats['shards']} shards "
+          f"({stats['reindexed']} of {stats['decks']} decks re-indexed)")
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild all slideshows and the root index')
+    parser.add_argument('--force', '-f', action='store_true', help='Rebuild every deck, even if unchanged')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='Number of worker processes')
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--split-assets', dest='split_assets', action='store_const', const=True,
+                      help='Emit shared, content-hashed CSS/JS and separate data JSON for every deck')
+    mode.add_argument('--inline', dest='split_assets', action='store_const', const=False,
+                      help='Inline CSS, JS and data into each deck page')
+    args = parser.parse_args()
+
+    print("🏗️  Building all slideshows...\n")
+    failed = build_all(force=args.force, jobs=args.jobs, split_assets=args.split_assets)
+    if failed:
+        print(f"\n❌ {len(failed)} slideshows failed to build")
+        return 1
+    if has_published():
+        diff, current = changes_since_publish()
+        print(f"📦 Site files since the last publish: {change_summary(diff) or 'none changed'} "
+              f"(details: python _tools/artifacts.py)")
+    else:
+        print("📦 No publish recorded yet (after deploying: python _tools/artifacts.py --record)")
+    print("\n✅ Build complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,53 +4,84 @@ Create a new slideshow from input content.
 
 This script helps you:
 1. Read input from various sources (text file, markdown, etc.)
-2. Transform it into slideshow JSON using an LLM prompt
+2. Transform it into slideshow JSON using an LLM prompt (long inputs are
+   analyzed section by section in parallel; results are cached, see transform.py)
 3. Generate the HTML slideshow
 4. Optionally generate audio files
 
+The steps run in this process; create_deck() is also available from the
+_tools package for batch use.
+
 Usage:
     python create_slideshow.py --input notes.txt --name "my-presentation"
     python create_slideshow.py --input notes.txt --name "my-presentation" --generate-audio
 """
 
+import io
 import os
 import sys
+import html
 import json
 import argparse
 import shutil
 from pathlib import Path
 from datetime import datetime
 
-def read_input_file(file_path):
-    """Read content from input file."""
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
-    except Exception as e:
-        print(f"Error reading input file: {e}")
-        sys.exit(1)
+from assets import remove_split_outputs, render_split, uses_split_assets
+from fileio import atomic_write
+from instrumentation import enable as enable_profiling, finish as finish_profiling, span
+from llm_client import get_llm_client
+from service_worker import write_service_worker
+from slide_markup import render_slides, slide_count
+from template_engine import json_for_script, load_template
+from transform import transform_lines
 
-def read_prompt_template():
-    """Read the transformation prompt template."""
-    prompt_path = Path(__file__).parent.parent / '_prompts' / 'transform_to_slides.md'
-    with open(prompt_path, 'r') as f:
-        return f.read()
+def read_input_file(file_path):
+    """Read content from input file. Raises OSError if it can't be read."""
+    with open(file_path, 'r', encoding='utf-8') as f, span('read') as fields:
+        content = f.read()
+        fields['chars'] = len(content)
+        return content
 
-def transform_content_to_json(input_content):
+def transform_content_to_json(input_content, client=None, jobs=4):
     """
     Transform input content to slideshow JSON.
     
-    In a real implementation, this would call an LLM API.
-    For now, we'll create a sample structure that shows what would be generated.
+    Uses the LLM client (see llm_client.py) with the map-reduce transform in
+    transform.py. Without an API key, a sample structure is returned instead.
     """
-    # This is where you would:
-    # 1. Load the prompt template
-    # 2. Replace {{INPUT_CONTENT}} with actual content
-    # 3. Call LLM API (OpenAI, Claude, etc.)
-    # 4. Parse the JSON response
+    client = client or get_llm_client()
+    if client is None:
+        return demo_slideshow(input_content)
+    
+    print("\n📝 Analyzing content and generating slideshow structure...")
+    with span('transform'):
+        slideshow_data, stats = transform_lines(io.StringIO(input_content), client, jobs=jobs)
+    print_transform_stats(stats)
+    return slideshow_data
+
+def transform_input_file(file_path, client=None, jobs=4):
+    """Transform an input file, streaming it section by section."""
+    client = client or get_llm_client()
+    if client is None:
+        return demo_slideshow(read_input_file(file_path))
     
     print("\n📝 Analyzing content and generating slideshow structure...")
-    print("ℹ️  Note: This is a demo. In production, this would use an LLM to transform your content.")
+    # Reading is interleaved with the map step, so it is timed as part of it
+    with open(file_path, 'r', encoding='utf-8') as f, span('transform', streamed=True):
+        slideshow_data, stats = transform_lines(f, client, jobs=jobs)
+    print_transform_stats(stats)
+    return slideshow_data
+
+def print_transform_stats(stats):
+    print(f"   ✓ {stats['sections']} sections, {stats['requests']} LLM requests, "
+          f"{stats['cached']} answered from cache")
+
+def demo_slideshow(input_content):
+    """Sample structure showing what the LLM transform produces."""
+    print("\n📝 Analyzing content and generating slideshow structure...")
+    print("ℹ️  Note: No API key found, so this is a demo structure. "
+          "Set OPENAI_API_KEY to transform your content with an LLM.")
     
     # For demo purposes, create a sample structure
     sample_json = {
@@ -124,86 +155,117 @@ def transform_content_to_json(input_content):
     
     return sample_json
 
-def create_slideshow_directory(name):
-    """Create directory structure for new slideshow."""
+def create_slideshow_directory(name, overwrite=None):
+    """
+    Create directory structure for new slideshow.
+    
+    An existing directory is replaced if overwrite is true; with None the
+    user is asked. Raises FileExistsError if it is kept.
+    """
     base_path = Path(__file__).parent.parent
     slideshow_path = base_path / name
     
     if slideshow_path.exists():
-        response = input(f"\n⚠️  Directory '{name}' already exists. Overwrite? (y/n): ")
-        if response.lower() != 'y':
-            print("Aborted.")
-            sys.exit(0)
+        if overwrite is None:
+            response = input(f"\n⚠️  Directory '{name}' already exists. Overwrite? (y/n): ")
+            overwrite = response.lower() == 'y'
+        if not overwrite:
+            raise FileExistsError(f"Directory '{name}' already exists")
         shutil.rmtree(slideshow_path)
     
     slideshow_path.mkdir()
     return slideshow_path
 
-def generate_html(slideshow_data, slideshow_path):
-    """Generate HTML file from slideshow data and template."""
-    template_path = Path(__file__).parent.parent / '_templates' / 'slideshow_template.html'
-    
-    with open(template_path, 'r') as f:
-        template = f.read()
-    
-    # Replace placeholders
-    html_content = template.replace('{{TITLE}}', slideshow_data['metadata']['title'])
-    html_content = html_content.replace('{{SLIDESHOW_DATA}}', json.dumps(slideshow_data, indent=2))
+def generate_html(slideshow_data, slideshow_path, split_assets=None):
+    """
+    Generate HTML file from slideshow data and template.
     
-    # Write HTML file
-    output_path = slideshow_path / 'index.html'
-    with open(output_path, 'w') as f:
-        f.write(html_content)
+    With split_assets, the CSS, player JS and data are written as separate
+    content-hashed files (see assets.py). By default a deck keeps the mode
+    its current index.html was built with. The deck's service worker is
+    rewritten to match (see service_worker.py).
+    """
+    template_path = Path(__file__).parent.parent / '_templates' / 'slideshow_template.html'
+    # Slides are rendered here, so the page paints before the player script runs
+    page_context = {
+        'TITLE': html.escape(slideshow_data['metadata']['title'], quote=False),
+        'SLIDES_HTML': render_slides(slideshow_data),
+        'SLIDE_COUNT': str(slide_count(slideshow_data)),
+    }
     
+    if split_assets is None:
+        split_assets = uses_split_assets(slideshow_path)
+    with span('render', slides=len(slideshow_data['slides']), split=split_assets):
+        if split_assets:
+            output_path = render_split(slideshow_data, slideshow_path, template_path, page_context)
+        else:
+            remove_split_outputs(slideshow_path)
+            
+            template = load_template(template_path)
+            context = {
+                **page_context,
+                'SLIDESHOW_DATA': json_for_script(slideshow_data, indent=2)
+            }
+            
+            # Stream the rendered template into the HTML file
+            output_path = slideshow_path / 'index.html'
+            with atomic_write(output_path, if_changed=True) as f:
+                template.render_to(f, context)
+        
+        write_service_worker(slideshow_path)
     return output_path
 
 def save_json_data(slideshow_data, slideshow_path):
     """Save slideshow data as JSON for later editing."""
     json_path = slideshow_path / 'slideshow_data.json'
-    with open(json_path, 'w') as f:
+    with open(json_path, 'w') as f, span('save', file=json_path.name):
         json.dump(slideshow_data, f, indent=2)
     return json_path
 
 def update_main_index(name, slideshow_data):
     """Add new slideshow to main index.html."""
-    print("\n📋 To add this slideshow to the main index:")
-    print(f"   1. Edit index.html")
-    print(f"   2. Add a new card for '{name}' in the slideshows-grid")
-    print(f"   3. Use title: {slideshow_data['metadata']['title']}")
-    print(f"   4. Use {len(slideshow_data['slides'])} slides count")
-
-def main():
-    parser = argparse.ArgumentParser(description='Create a new slideshow from input content')
-    parser.add_argument('--input', '-i', required=True, help='Input file path')
-    parser.add_argument('--name', '-n', required=True, help='Slideshow directory name (use-kebab-case)')
-    parser.add_argument('--generate-audio', '-a', action='store_true', help='Generate audio files after creation')
-    parser.add_argument('--preview', '-p', action='store_true', help='Open preview after creation')
-    
-    args = parser.parse_args()
+    from build_all import find_decks, update_root_index
+    from search_index import find_search_decks, update_search_index
     
-    # Validate name format
-    if ' ' in args.name or args.name != args.name.lower():
-        print("❌ Error: Slideshow name should be lowercase with hyphens (e.g., 'my-presentation')")
-        sys.exit(1)
-    
-    print(f"🚀 Creating slideshow: {args.name}")
+    try:
+        with span('index'):
+            decks = find_decks()
+            count = update_root_index(decks)
+            update_search_index(find_search_decks())
+        print(f"\n📋 Updated main index.html and search index ({count} generated slideshows)")
+    except ValueError as e:
+        print(f"\n⚠️  Could not update main index.html: {e}")
+        print(f"   Add a card for '{name}' by hand, or run: python _tools/build_all.py")
+
+def validate_name(name):
+    if ' ' in name or name != name.lower():
+        raise ValueError("Slideshow name should be lowercase with hyphens (e.g., 'my-presentation')")
+
+def create_deck(input_path, name, jobs=4, split_assets=False, overwrite=False, client=None):
+    """
+    Create a slideshow from an input file in this process. Returns its directory.
     
-    # Step 1: Read input content
-    print(f"\n📖 Reading input from: {args.input}")
-    input_content = read_input_file(args.input)
-    print(f"   ✓ Read {len(input_content)} characters")
+    Raises ValueError for a badly formed name, OSError if the input can't be
+    read and FileExistsError if the deck exists and overwrite is false.
+    """
+    validate_name(name)
+    if overwrite is False and (Path(__file__).parent.parent / name).exists():
+        raise FileExistsError(f"Directory '{name}' already exists")
+    print(f"🚀 Creating slideshow: {name}")
     
-    # Step 2: Transform content to slideshow JSON
-    slideshow_data = transform_content_to_json(input_content)
+    # Steps 1-2: Stream the input and transform it to slideshow JSON
+    print(f"\n📖 Reading input from: {input_path}")
+    print(f"   ✓ {os.path.getsize(input_path)} bytes")
+    slideshow_data = transform_input_file(input_path, client=client, jobs=jobs)
     print(f"   ✓ Generated {len(slideshow_data['slides'])} slides")
     
     # Step 3: Create directory structure
-    print(f"\n📁 Creating slideshow directory: {args.name}/")
-    slideshow_path = create_slideshow_directory(args.name)
+    print(f"\n📁 Creating slideshow directory: {name}/")
+    slideshow_path = create_slideshow_directory(name, overwrite)
     
     # Step 4: Generate HTML
     print("\n🎨 Generating HTML slideshow...")
-    html_path = generate_html(slideshow_data, slideshow_path)
+    html_path = generate_html(slideshow_data, slideshow_path, split_assets=split_assets)
     print(f"   ✓ Created: {html_path}")
     
     # Step 5: Save JSON data
@@ -211,26 +273,76 @@ def main():
     print(f"   ✓ Saved data: {json_path}")
     
     # Step 6: Update main index
-    update_main_index(args.name, slideshow_data)
+    update_main_index(name, slideshow_data)
+    return slideshow_path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Create a new slideshow from input content')
+    parser.add_argument('--input', '-i', required=True, help='Input file path')
+    parser.add_argument('--name', '-n', required=True, help='Slideshow directory name (use-kebab-case)')
+    parser.add_argument('--generate-audio', '-a', action='store_true', help='Generate audio files after creation')
+    parser.add_argument('--preview', '-p', action='store_true', help='Open preview after creation')
+    parser.add_argument('--jobs', '-j', type=int, default=4,
+                        help='Sections of a long input to analyze in parallel (default: 4)')
+    parser.add_argument('--split-assets', action='store_true',
+                        help='Emit shared, content-hashed CSS/JS and separate data JSON instead of one inlined page')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='FILE',
+                        help='Print per-stage timings at the end, and write them to FILE as JSON lines')
+    
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable_profiling(args.profile)
+    try:
+        return create(args)
+    finally:
+        finish_profiling()
+
+def create(args):
+    """Run the creation steps for parsed command-line arguments. Returns the exit status."""
+    try:
+        slideshow_path = create_deck(args.input, args.name, jobs=args.jobs,
+                                     split_assets=args.split_assets, overwrite=None)
+    except FileExistsError:
+        print("Aborted.")
+        return 0
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    except OSError as e:
+        print(f"Error reading input file: {e}")
+        return 1
+    except Exception as e:
+        print(f"❌ Error: could not transform the input: {e}")
+        return 1
     
-    # Step 7: Generate audio if requested
+    # Step 7: Generate audio if requested (in this process, see generate_audio.synthesize)
+    status = 0
     if args.generate_audio:
+        from generate_audio import synthesize
+        
         print("\n🎙️  Generating audio files...")
-        audio_script = Path(__file__).parent / 'generate_audio.py'
-        os.system(f'cd "{slideshow_path}" && python "{audio_script}"')
-    
-    # Step 8: Preview if requested
-    if args.preview:
-        print(f"\n🌐 Opening preview...")
-        os.system(f'cd "{slideshow_path}" && python ../../preview_slideshow.py')
+        try:
+            status = synthesize(slideshow_path)
+        except Exception as e:
+            print(f"❌ Error: could not generate audio: {e}")
+            status = 1
     
+    json_path = slideshow_path / 'slideshow_data.json'
     print(f"\n✅ Slideshow created successfully!")
     print(f"\n📝 Next steps:")
     print(f"   1. Review and edit: {json_path}")
     print(f"   2. Generate audio: cd {args.name} && python ../_tools/generate_audio.py")
-    print(f"   3. Preview locally: cd {args.name} && python ../preview_slideshow.py")
-    print(f"   4. Add to main index.html")
-    print(f"   5. Commit and push to GitHub")
+    print(f"   3. Preview locally: python preview_slideshow.py {args.name}")
+    print(f"   4. Commit and push to GitHub")
+    
+    # Step 8: Preview if requested; serves until Ctrl+C
+    if args.preview:
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from preview_slideshow import serve
+        
+        print(f"\n🌐 Opening preview...")
+        serve(args.name)
+    return status
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Small file helpers shared by the slideshow tools.
+
+Everything that writes generated output goes through atomic_write(): data
+is written to a temporary sibling, flushed to disk and renamed over the
+target, so an interrupted run never leaves a truncated file behind.
+"""
+
+import os
+import filecmp
+import hashlib
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+PART_SUFFIX = '.part'
+CHUNK_SIZE = 64 * 1024
+
+
+def part_path(path):
+    """Temporary sibling of path owned by this process and thread."""
+    return path.with_name(f".{path.name}.{os.getpid()}-{threading.get_ident()}{PART_SUFFIX}")
+
+
+@contextmanager
+def atomic_write(path, binary=False, encoding='utf-8', if_changed=False):
+    """
+    Open a temporary file that replaces path only if the block succeeds.
+
+    With if_changed, a path that already holds exactly the new content is
+    left untouched, so its mtime stays put and a publish doesn't see it as
+    changed (see artifacts.py).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = part_path(path)
+    mode = 'wb' if binary else 'w'
+    try:
+        with open(tmp_path, mode, **({} if binary else {'encoding': encoding})) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if if_changed and path.is_file() and filecmp.cmp(tmp_path, path, shallow=False):
+            tmp_path.unlink()
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def file_digest(path):
+    """SHA-256 of a file, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale_parts(directory):
+    """Delete temporary files left by writers that are no longer running."""
+    removed = []
+    directory = Path(directory)
+    if not directory.exists():
+        return removed
+    for part in directory.glob(f'.*{PART_SUFFIX}'):
+        owner = part.name[:-len(PART_SUFFIX)].rsplit('.', 1)[-1].split('-', 1)[0]
+        if owner.isdigit() and _pid_alive(int(owner)):
+            continue
+        try:
+            part.unlink()
+            removed.append(part)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+class LockedError(Exception):
+    """Raised when another live process holds a lock file."""
+
+
+def _try_lock(fd):
+    """Lock an open file without waiting. False if another process holds it."""
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except (BlockingIOError, PermissionError):
+        return False
+    return True
+
+
+def _lock_owner(fd):
+    """Pid recorded in a lock file held by someone else, if it can be read."""
+    if not fcntl:
+        # msvcrt locks make the locked byte unreadable to other processes
+        return None
+    owner = os.pread(fd, 32, 0).decode(errors='replace').strip()
+    return owner if owner.isdigit() else None
+
+
+@contextmanager
+def exclusive_lock(path):
+    """
+    Hold path as a lock file (containing our pid) for the duration of the block.
+
+    The lock is an OS file lock (flock, or msvcrt on Windows), so the
+    kernel drops it when its process exits and a lock file left behind by
+    a crash is simply locked again; no one ever has to remove another
+    process's lock.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not _try_lock(fd):
+            owner = _lock_owner(fd)
+            os.close(fd)
+            raise LockedError(f"{path} is held by {f'process {owner}' if owner else 'another process'}")
+        try:
+            current = os.path.samestat(os.fstat(fd), os.stat(path))
+        except FileNotFoundError:
+            current = False
+        if current:
+            break
+        # The previous holder removed the file after we opened it; lock the one at path now
+        os.close(fd)
+    try:
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        yield path
+    finally:
+        # Remove the file while still holding it, so a waiting opener sees it is gone
+        try:
+            path.unlink()
+        except OSError:
+            pass
+        os.close(fd)
@@ -3,46 +3,78 @@
 Generate MP3 audio files for slideshow from JSON data.
 
 This script:
-1. Reads slideshow_data.json in the current directory
+1. Reads slideshow_data.json in the current (or given) deck directory
 2. Extracts all speaker scripts
-3. Generates MP3 files using OpenAI TTS
+3. Generates MP3 files using OpenAI TTS (several requests in flight,
+   throttled by a requests-per-minute limiter), or offline with a local
+   synthesizer or fake engine (--backend, see tts_backends.py)
 4. Updates the JSON to mark audio as generated
 
+Audio is content-addressed: each script is keyed on its normalized text,
+voice and model (see audio_cache.py), so only slides whose narration
+actually changed are re-synthesized. Reordering or inserting slides just
+re-copies existing audio. Responses are streamed to disk and renamed into
+place only once complete, and every file is checked against the size and
+SHA-256 recorded in manifest.json before it is treated as done.
+
+Each clip's exact duration and bitrate are read from its MP3 frame
+headers (see mp3.py) and recorded in manifest.json; their total replaces
+the deck's hand-typed metadata.duration, and the per-slide durations let
+the player schedule prefetching before any audio has downloaded.
+
+Progress is recorded per slide in slideshow_audio/.journal.json under a
+lock file, so only one run works on a deck at a time and a run that
+crashed or was interrupted resumes with the slides that aren't done.
+hasAudio and manifest.json are only updated once every slide is verified.
+
+With --segment (or automatically, for scripts longer than the TTS input
+limit), scripts are split into sentences that are synthesized in parallel
+and cached individually, then spliced back into each slide-N.mp3, so
+editing one sentence only re-synthesizes that sentence.
+
+With --sprite, all slides are also spliced (frame by frame, without
+re-encoding) into a single slideshow_audio/sprite.mp3, and the player
+plays each slide as a segment of that one file.
+
+Publishing also rewrites the deck's service worker (sw.js), so browsers
+that have opened the deck re-fetch only the clips that changed and can
+play it offline (see service_worker.py).
+
 Usage:
     cd slideshow-directory
     python ../_tools/generate_audio.py
+    python _tools/generate_audio.py my-deck       # from the repository root
+    python ../_tools/generate_audio.py --concurrency 8 --rpm 100
+    python ../_tools/generate_audio.py --sprite
+    python ../_tools/generate_audio.py --segment
+    python ../_tools/generate_audio.py --profile timings.jsonl
+    python ../_tools/generate_audio.py --backend local -j 8   # offline draft
 """
 
 import os
 import json
 import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import urllib.request
-import urllib.error
 
-def get_api_key():
-    """Get API key from the absolute path."""
-    key_file_path = '/Users/cam/keys/openai-key.js'
-    
-    try:
-        with open(key_file_path, 'r') as f:
-            content = f.read()
-        
-        # Extract the API key from the JS export
-        import re
-        match = re.search(r'OPENAI_API_KEY\s*=\s*["\'](.*?)["\']', content)
-        if match:
-            return match.group(1).strip()
-        else:
-            raise ValueError("Could not find OPENAI_API_KEY in key file")
-    except FileNotFoundError:
-        raise ValueError(f"Key file not found at {key_file_path}")
-    except Exception as e:
-        raise ValueError(f"Error reading key file: {e}")
+from audio_cache import AudioCache, cache_key, spliced_key
+from fileio import LockedError, atomic_write, file_digest, remove_stale_parts
+from instrumentation import count, enable as enable_profiling, finish as finish_profiling, span
+from journal import DONE, FAILED, IN_FLIGHT, JobJournal
+from mp3 import audio_info, splice
+from rate_limiter import RateLimiter
+from segments import needs_segmenting, segment_script
+from service_worker import write_service_worker
+from tts_backends import BACKENDS, LOCAL_COMMAND_ENV, BackendError, get_backend
+from tts_client import AUDIO_FORMATS, DEFAULT_MODEL as TTS_MODEL, MAX_INPUT_CHARS, TTSError, configure
+
+SPRITE_FILENAME = 'sprite.mp3'
 
-def load_slideshow_data():
+
+def load_slideshow_data(deck_dir='.'):
     """Load slideshow data from JSON file."""
-    json_path = Path('slideshow_data.json')
+    json_path = Path(deck_dir) / 'slideshow_data.json'
     
     if not json_path.exists():
         raise FileNotFoundError("slideshow_data.json not found. Run this script from the slideshow directory.")
@@ -73,160 +105,615 @@ def extract_scripts(slideshow_data):
     
     return scripts
 
-def generate_audio(text, voice='shimmer'):
-    """Generate audio using OpenAI TTS API."""
-    api_key = get_api_key()
-    
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
-    
-    data_json = json.dumps({
-        'model': 'tts-1',
-        'input': text,
-        'voice': voice
-    }).encode('utf-8')
-    
-    request = urllib.request.Request(
-        'https://api.openai.com/v1/audio/speech',
-        data=data_json,
-        headers=headers,
-        method='POST'
-    )
+def synthesize_with_retries(path, text, voice, limiter, max_retries=3, backend=None, audio_format='mp3'):
+    """
+    Generate audio with backend (default: OpenAI), backing off on throttling.
+
+    Only remote backends wait for the rate limiter.
+    """
+    backend = backend or get_backend()
+    if not backend.rate_limited:
+        limiter = None
+    attempt = 0
+    while True:
+        if limiter:
+            with span('rate_wait'):
+                limiter.acquire()
+        try:
+            with span('tts', backend=backend.name, chars=len(text), attempt=attempt) as fields:
+                result = backend.synthesize_to(path, text, voice, audio_format)
+                fields['bytes'] = result[0]
+        except TTSError as e:
+            if not e.retryable or attempt >= max_retries or not limiter:
+                raise
+            attempt += 1
+            count('tts_retries', status=e.status)
+            limiter.penalize(e.retry_after)
+            continue
+        count('tts_bytes', result[0])
+        if limiter:
+            limiter.reward()
+        return result
+
+def update_slideshow_metadata(slideshow_data, deck_dir='.', audio_changed=True):
+    """
+    Update slideshow metadata to indicate audio has been generated.
+
+    audioGeneratedAt is only restamped when the audio itself changed, so a
+    re-run over current audio leaves slideshow_data.json byte-for-byte alone.
+    """
+    metadata = slideshow_data['metadata']
+    metadata['hasAudio'] = True
+    if audio_changed or 'audioGeneratedAt' not in metadata:
+        metadata['audioGeneratedAt'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
     
-    try:
-        with urllib.request.urlopen(request) as response:
-            if response.status != 200:
-                error_data = response.read().decode('utf-8')
-                raise Exception(f"API error {response.status}: {error_data}")
-            return response.read()
-    except urllib.error.HTTPError as e:
-        error_data = e.read().decode('utf-8')
-        raise Exception(f"API error {e.code}: {error_data}")
-
-def update_slideshow_metadata(slideshow_data):
-    """Update slideshow metadata to indicate audio has been generated."""
-    slideshow_data['metadata']['hasAudio'] = True
-    slideshow_data['metadata']['audioGeneratedAt'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
-    
-    with open('slideshow_data.json', 'w') as f:
+    with atomic_write(Path(deck_dir) / 'slideshow_data.json', if_changed=True) as f, \
+            span('save', file='slideshow_data.json'):
         json.dump(slideshow_data, f, indent=2)
 
-def update_html_file(slideshow_data):
-    """Update the HTML file with the new slideshow data."""
-    html_path = Path('index.html')
-    
-    if not html_path.exists():
-        print("⚠️  Warning: index.html not found. Audio files generated but HTML not updated.")
-        return
-    
-    with open(html_path, 'r') as f:
-        html_content = f.read()
+def update_html_file(slideshow_data, deck_dir='.'):
+    """Re-render the HTML file from the updated slideshow data."""
+    from create_slideshow import generate_html
     
-    # Find and replace the slideshowData
-    import re
-    pattern = r'let slideshowData = {.*?};'
-    replacement = f'let slideshowData = {json.dumps(slideshow_data, indent=8)};'
-    
-    # Adjust indentation for the replacement
-    replacement_lines = replacement.split('\n')
-    replacement_lines = [replacement_lines[0]] + ['        ' + line for line in replacement_lines[1:]]
-    replacement = '\n'.join(replacement_lines)
-    
-    html_content = re.sub(pattern, replacement, html_content, flags=re.DOTALL)
-    
-    with open(html_path, 'w') as f:
-        f.write(html_content)
+    generate_html(slideshow_data, Path(deck_dir))
 
-def main():
-    """Main function to generate all audio files."""
-    print("🎙️  Generating audio files for slideshow...\n")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate narration audio for a slideshow')
+    parser.add_argument('deck', nargs='?', default='.',
+                        help='Deck directory (default: the current directory)')
+    parser.add_argument('--concurrency', '-j', type=int, default=4,
+                        help='Maximum number of TTS requests in flight (default: 4)')
+    parser.add_argument('--rpm', type=float, default=50,
+                        help='Maximum TTS requests per minute (default: 50)')
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help='Retries per slide after throttling or server errors (default: 3)')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='Runs in which a failing slide is retried before it is skipped (default: 3)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Retry slides that were skipped after repeated failures')
+    parser.add_argument('--endpoint', default=None,
+                        help='Speech endpoint URL, e.g. a local mock server (default: OpenAI, or $SLIDES_TTS_ENDPOINT)')
+    parser.add_argument('--segment', action=argparse.BooleanOptionalAction, default=None,
+                        help='Synthesize scripts sentence by sentence and splice the results '
+                             '(default: keep the deck\'s current setting; long scripts are always segmented)')
+    parser.add_argument('--sprite', action=argparse.BooleanOptionalAction, default=None,
+                        help='Also splice all slides into one sprite file (default: keep the deck\'s current setting)')
+    parser.add_argument('--formats', type=parse_formats, default=None, metavar='LIST',
+                        help='Compact formats to store next to each MP3, e.g. opus,aac; the player '
+                             'picks the smallest one the browser supports ("mp3" for none; '
+                             'default: keep the deck\'s current setting)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                        help='TTS engine: openai, local (command line synthesizer) or fake '
+                             '(default: the deck\'s metadata.ttsBackend, else openai)')
+    parser.add_argument('--tts-command', default=None, metavar='COMMAND',
+                        help='Synthesizer command for the local backend (default: $SLIDES_TTS_COMMAND, '
+                             'else espeak-ng piped into lame)')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='FILE',
+                        help='Print per-stage timings at the end, and write them to FILE as JSON lines')
+    return parser.parse_args(argv)
+
+def key_scripts(scripts, voice, segment, model=TTS_MODEL, formats=()):
+    """
+    Give each script its cache key and the parts to synthesize for it.
+
+    A segmented script is keyed on its segments' keys, so its spliced audio
+    is cached too, and each segment is cached (and shared) on its own.
+    Compact formats are whole-script variants next to the MP3; scripts too
+    long for one request stay MP3 only.
+    """
+    for script in scripts:
+        if segment or needs_segmenting(script['text']):
+            texts = segment_script(script['text'])
+        else:
+            texts = [script['text']]
+        script['parts'] = [{'text': text, 'hash': cache_key(text, voice, model)} for text in texts]
+        if len(texts) > 1:
+            script['hash'] = spliced_key(part['hash'] for part in script['parts'])
+        else:
+            script['hash'] = cache_key(script['text'], voice, model)
+            script['parts'][0]['hash'] = script['hash']
+        script['variants'] = [
+            {'text': script['text'], 'hash': cache_key(script['text'], voice, f"{model}:{fmt}"), 'format': fmt}
+            for fmt in formats if len(script['text']) <= MAX_INPUT_CHARS
+        ]
+
+def script_parts(script):
+    """Everything synthesized for a script: its MP3 parts, then its compact variants."""
+    return script['parts'] + script.get('variants', [])
+
+def audio_sources(script):
+    """Every stored format of a script's audio for the manifest, smallest first."""
+    sources = [{'format': 'mp3', 'filename': f"{script['id']}.mp3", 'hash': script['hash'],
+                'bytes': script['bytes'], 'sha256': script['sha256']}]
+    sources += [
+        {'format': v['format'], 'filename': f"{script['id']}.{v['format']}", 'hash': v['hash'],
+         'bytes': v['bytes'], 'sha256': v['sha256']}
+        for v in script.get('variants', [])
+    ]
+    return sorted(sources, key=lambda source: source['bytes'])
+
+def remove_stale_variants(scripts, audio_dir):
+    """Delete compact-format files that no current script records."""
+    keep = {f"{s['id']}.{v['format']}" for s in scripts for v in s.get('variants', [])}
+    for fmt in AUDIO_FORMATS:
+        if fmt == 'mp3':
+            continue
+        for path in Path(audio_dir).glob(f'*.{fmt}'):
+            if path.name not in keep:
+                path.unlink()
+
+def parse_formats(value):
+    """--formats value: compact formats to store next to the MP3 ('mp3' alone means none)."""
+    formats = [fmt.strip().lower() for fmt in value.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in AUDIO_FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown format {', '.join(unknown)} (choose from {', '.join(AUDIO_FORMATS)})")
+    return [fmt for fmt in dict.fromkeys(formats) if fmt != 'mp3']
+
+def load_manifest(audio_dir):
+    """Load the previous manifest, or an empty one."""
+    manifest_path = Path(audio_dir) / 'manifest.json'
+    if not manifest_path.exists():
+        return {'files': []}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+def adopt_existing_audio(audio_dir, manifest, cache):
+    """
+    Move audio from a previous run into the cache before any file is replaced.
+
+    Entries recorded with a hash are stored under that hash once they pass
+    verification. Older manifests have no hash and don't record the text a
+    file was made from, so their files are never adopted: caching one under
+    the current script's key would hand stale narration to every deck with
+    that script. Those slides are regenerated instead.
+    """
+    for entry in manifest.get('files', []):
+        path = Path(audio_dir) / entry['filename']
+        if not entry.get('hash') or not verify_audio(path, entry):
+            continue
+        for source in entry.get('sources', []):
+            variant_path = Path(audio_dir) / source['filename']
+            if source['format'] != 'mp3' and source.get('hash') and verify_audio(variant_path, source):
+                cache.put_file(source['hash'], variant_path, source['format'])
+        cache.put_file(entry['hash'], path)
+
+def verify_audio(path, entry):
+    """Check a file against the size and digest recorded in its manifest entry."""
+    path = Path(path)
+    if not path.exists() or 'bytes' not in entry or 'sha256' not in entry:
+        return False
+    if path.stat().st_size != entry['bytes']:
+        return False
+    return file_digest(path) == entry['sha256']
+
+def variants_current(script, entry, audio_dir):
+    """Whether every compact variant of script is on disk as recorded in entry."""
+    sources = {source['format']: source for source in entry.get('sources', [])}
+    for variant in script.get('variants', []):
+        source = sources.get(variant['format'])
+        if not source or source.get('hash') != variant['hash'] \
+                or not verify_audio(Path(audio_dir) / source['filename'], source):
+            return False
+    return True
+
+def plan_audio(scripts, audio_dir, manifest, cache):
+    """Decide for each script whether it is current, cached or must be generated."""
+    previous = {entry['id']: entry for entry in manifest.get('files', [])}
+    plan = []
+    for script in scripts:
+        filename = Path(audio_dir) / f"{script['id']}.mp3"
+        entry = previous.get(script['id'], {})
+        if entry.get('hash') == script['hash'] and verify_audio(filename, entry) \
+                and variants_current(script, entry, audio_dir):
+            script['bytes'], script['sha256'] = entry['bytes'], entry['sha256']
+            if 'duration' in entry:
+                script['duration'], script['bitrate'] = entry['duration'], entry.get('bitrate', 0)
+            sources = {source['format']: source for source in entry.get('sources', [])}
+            for variant in script.get('variants', []):
+                variant['bytes'] = sources[variant['format']]['bytes']
+                variant['sha256'] = sources[variant['format']]['sha256']
+            plan.append('current')
+        elif cache.get(script['hash']) and all(cache.get(v['hash'], v['format']) for v in script.get('variants', [])):
+            plan.append('cached')
+        else:
+            plan.append('generate')
+    return plan
+
+def measure_audio(scripts, audio_dir):
+    """Record each slide's exact duration and bitrate from its MP3 frame headers."""
+    for script in scripts:
+        path = Path(audio_dir) / f"{script['id']}.mp3"
+        if 'duration' in script or 'sha256' not in script or not path.exists():
+            continue
+        info = audio_info(path)
+        script['duration'] = round(info['duration'], 3)
+        script['bitrate'] = info['bitrate']
+
+def format_duration(seconds):
+    """Deck runtime as shown on the index cards, e.g. '8 min'."""
+    return f"{max(1, round(seconds / 60))} min"
+
+def update_durations(metadata, scripts):
+    """Roll per-slide durations up into the deck metadata, once every slide is measured."""
+    if not all('duration' in s for s in scripts):
+        return None
+    durations = [s['duration'] for s in scripts]
+    total = sum(durations)
+    metadata['audioDurations'] = durations
+    metadata['durationSeconds'] = round(total, 1)
+    metadata['duration'] = format_duration(total)
+    return total
+
+def build_sprite(scripts, audio_dir):
+    """Splice every slide's MP3 into one sprite file. Returns its manifest entry."""
+    sources = [Path(audio_dir) / f"{s['id']}.mp3" for s in scripts]
+    missing = [path.name for path in sources if not path.exists()]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
     
-    try:
-        # Load slideshow data
-        slideshow_data = load_slideshow_data()
-        voice = slideshow_data['metadata'].get('voice', 'shimmer')
-        
-        print(f"📚 Loaded slideshow: {slideshow_data['metadata']['title']}")
-        print(f"🎤 Using voice: {voice}\n")
+    sprite_path = Path(audio_dir) / SPRITE_FILENAME
+    segments = splice(sources, sprite_path)
+    return {
+        'filename': SPRITE_FILENAME,
+        'bytes': sprite_path.stat().st_size,
+        'sha256': file_digest(sprite_path),
+        'segments': [{'id': s['id'], **segment} for s, segment in zip(scripts, segments)]
+    }
+
+def synthesize_to_cache(part, voice, cache, limiter, max_retries, backend=None):
+    """Stream a script, segment or variant's audio into the cache. Runs on a worker thread."""
+    audio_format = part.get('format', 'mp3')
+    return synthesize_with_retries(cache.path_for(part['hash'], audio_format), part['text'], voice, limiter,
+                                   max_retries, backend, audio_format)
+
+def splice_to_cache(script, cache):
+    """Splice a segmented script's cached segments into its own cache entry."""
+    destination = cache.path_for(script['hash'])
+    with span('splice', parts=len(script['parts'])):
+        splice([cache.path_for(part['hash']) for part in script['parts']], destination)
+    return destination.stat().st_size, file_digest(destination)
+
+class AudioJob:
+    """
+    One deck's audio run: plan the work, complete slides as their audio
+    arrives, then publish the manifest and metadata once all are verified.
+
+    main() runs a single job; schedule_audio.py runs many under one budget.
+    """
+
+    def __init__(self, deck_dir='.', cache=None, segment=None, sprite=None, max_attempts=3, retry_failed=False,
+                 backend=None, formats=None, tts_command=None):
+        self.deck_dir = Path(deck_dir)
+        self.audio_dir = self.deck_dir / 'slideshow_audio'
+        with span('load', deck=self.deck_dir.resolve().name):
+            self.slideshow_data = load_slideshow_data(self.deck_dir)
+        self.metadata = self.slideshow_data['metadata']
+        self.voice = self.metadata.get('voice', 'shimmer')
+        # A deck may pick its engine, but a command line only comes from whoever runs the tools
+        self.backend = get_backend(backend or self.metadata.get('ttsBackend'), tts_command)
+        if self.metadata.get('ttsCommand'):
+            print(f"⚠️  Ignoring metadata.ttsCommand in {self.deck_dir.resolve().name}: "
+                  f"pass --tts-command or set {LOCAL_COMMAND_ENV} instead")
+        self.cache = cache or AudioCache()
+        self.formats = formats
+        self.segment = segment
+        self.sprite = sprite
+        self.retry_failed = retry_failed
+        self.journal = JobJournal(self.audio_dir, max_attempts)
+        self.scripts = []
+        self.plan = []
+        self.exhausted = set()
+
+    def lock(self):
+        """Hold the deck's lock for the whole run. Raises fileio.LockedError if busy."""
+        self.audio_dir.mkdir(exist_ok=True)
+        return self.journal.lock()
+
+    def prepare(self):
+        """Key the scripts and decide what every slide needs. Call while holding the lock."""
+        with span('plan', deck=self.deck_dir.resolve().name):
+            self._prepare()
+
+    def _prepare(self):
+        for part in remove_stale_parts(self.audio_dir) + self.cache.remove_stale_parts():
+            print(f"🧹 Removed partial file from an interrupted run: {part.name}")
         
-        # Create audio directory
-        audio_dir = Path('slideshow_audio')
-        audio_dir.mkdir(exist_ok=True)
+        # Key each script (or each of its sentences) by content
+        segment = self.segment if self.segment is not None else bool(self.metadata.get('segmentAudio'))
+        if segment:
+            self.metadata['segmentAudio'] = True
+        else:
+            self.metadata.pop('segmentAudio', None)
+        formats = self.formats if self.formats is not None else self.metadata.get('audioFormats', [])
+        unsupported = [fmt for fmt in formats if fmt not in self.backend.formats]
+        if unsupported:
+            raise BackendError(f"The {self.backend.name} backend can't produce {', '.join(unsupported)}")
+        if formats:
+            self.metadata['audioFormats'] = list(formats)
+        else:
+            self.metadata.pop('audioFormats', None)
+        self.scripts = extract_scripts(self.slideshow_data)
+        key_scripts(self.scripts, self.voice, segment, self.backend.model, formats)
         
-        # Extract scripts
-        scripts = extract_scripts(slideshow_data)
-        print(f"📝 Found {len(scripts)} scripts to convert\n")
+        manifest = load_manifest(self.audio_dir)
+        adopt_existing_audio(self.audio_dir, manifest, self.cache)
         
-        # Process each script
-        for i, script in enumerate(scripts):
-            filename = audio_dir / f"{script['id']}.mp3"
-            
-            print(f"[{i + 1}/{len(scripts)}] Generating {script['id']}...")
-            
-            if filename.exists():
-                print(f"   ✓ Already exists, skipping")
+        # Slides verified by an interrupted run count as up to date
+        self.exhausted = set(self.journal.start(self.scripts, retry_failed=self.retry_failed))
+        known = {'files': manifest.get('files', []) + self.journal.completed()}
+        plan = plan_audio(self.scripts, self.audio_dir, known, self.cache)
+        self.plan = ['skip' if s['id'] in self.exhausted and action != 'current' else action
+                     for s, action in zip(self.scripts, plan)]
+        for s, action in zip(self.scripts, self.plan):
+            if action == 'current':
+                self.journal.slides[s['id']].update(state=DONE, bytes=s['bytes'], sha256=s['sha256'],
+                                                    **({'sources': audio_sources(s)} if s['variants'] else {}))
+        self.journal.save()
+
+    def parts_to_synthesize(self):
+        """(slide index, part) for every script or segment that isn't cached, each once."""
+        seen = set()
+        parts = []
+        for i, (script, action) in enumerate(zip(self.scripts, self.plan)):
+            if action != 'generate':
                 continue
-            
+            for part in script_parts(script):
+                if part['hash'] not in seen and not self.cache.get(part['hash'], part.get('format', 'mp3')):
+                    seen.add(part['hash'])
+                    parts.append((i, part))
+        return parts
+
+    def start(self):
+        """Record every slide that is about to be produced as in flight."""
+        self.journal.mark([s['id'] for s, action in zip(self.scripts, self.plan)
+                           if action in ('generate', 'cached')], IN_FLIGHT)
+
+    def complete(self, script, action, synthesized=0):
+        """
+        Copy a slide's audio from the cache into the deck, verify and record it.
+
+        Call once its parts are in the cache. Returns a progress message.
+        """
+        filename = self.audio_dir / f"{script['id']}.mp3"
+        if len(script['parts']) > 1 and not self.cache.get(script['hash']):
+            script['bytes'], script['sha256'] = splice_to_cache(script, self.cache)
+        else:
+            blob = self.cache.path_for(script['hash'])
+            script['bytes'], script['sha256'] = blob.stat().st_size, file_digest(blob)
+        with span('copy', bytes=script['bytes']):
+            self.cache.materialize(script['hash'], filename)
+            verified = verify_audio(filename, script)
+        if not verified:
+            raise ValueError(f"{filename.name} doesn't match the audio it was copied from")
+        for variant in script['variants']:
+            blob = self.cache.path_for(variant['hash'], variant['format'])
+            variant['bytes'], variant['sha256'] = blob.stat().st_size, file_digest(blob)
+            variant_path = self.audio_dir / f"{script['id']}.{variant['format']}"
+            self.cache.materialize(variant['hash'], variant_path, variant['format'])
+            if not verify_audio(variant_path, variant):
+                raise ValueError(f"{variant_path.name} doesn't match the audio it was copied from")
+        self.journal.mark([script['id']], DONE, bytes=script['bytes'], sha256=script['sha256'],
+                          **({'sources': audio_sources(script)} if script['variants'] else {}))
+        if action == 'cached':
+            return "Reused cached audio"
+        if len(script['parts']) > 1:
+            return f"Spliced {len(script['parts'])} sentences ({synthesized} synthesized)"
+        return "Generated successfully"
+
+    def fail(self, script, error):
+        self.journal.mark([script['id']], FAILED, reason=str(error))
+
+    def publish(self):
+        """
+        Write durations, sprite, metadata, HTML and manifest if every slide is done.
+
+        Returns the failures ({slide id: reason}); nothing is published unless empty.
+        """
+        failures = self.journal.failures()
+        if failures:
+            return failures
+        
+        # Measure clips from their frame headers; no decoding needed
+        scripts, metadata, audio_dir = self.scripts, self.metadata, self.audio_dir
+        with span('measure'):
+            measure_audio(scripts, audio_dir)
+        total = update_durations(metadata, scripts)
+        if total is not None:
+            print(f"⏱️  Narration runs {total:.1f}s at normal speed ({metadata['duration']})")
+        
+        # Splice the sprite, or drop a previous one so it can't go stale
+        use_sprite = self.sprite if self.sprite is not None else 'audioSprite' in metadata
+        sprite = None
+        if use_sprite:
             try:
-                # Generate audio
-                audio_data = generate_audio(script['text'], voice)
-                
-                # Save to file
-                with open(filename, 'wb') as f:
-                    f.write(audio_data)
-                
-                print(f"   ✓ Generated successfully")
-                
-                # Add delay to avoid rate limiting (except for last item)
-                if i < len(scripts) - 1:
-                    time.sleep(1)
-                    
-            except Exception as e:
-                print(f"   ❌ Error: {e}")
-                continue
+                with span('sprite'):
+                    sprite = build_sprite(scripts, audio_dir)
+                metadata['audioSprite'] = {
+                    'filename': sprite['filename'],
+                    'segments': [
+                        {'start': segment['start'], 'duration': segment['duration']}
+                        for segment in sprite['segments']
+                    ]
+                }
+                print(f"🧩 Spliced {len(scripts)} slides into {audio_dir}/{SPRITE_FILENAME}")
+            except ValueError as e:
+                print(f"⚠️  Could not build audio sprite: {e}")
+        if sprite is None:
+            metadata.pop('audioSprite', None)
+            (audio_dir / SPRITE_FILENAME).unlink(missing_ok=True)
         
-        # Update metadata
-        update_slideshow_metadata(slideshow_data)
-        update_html_file(slideshow_data)
+        # Let the player choose among formats; a deck without variants plays MP3 as before
+        remove_stale_variants(scripts, audio_dir)
+        if any(s['variants'] for s in scripts):
+            metadata['audioSources'] = [
+                [{'format': source['format'], 'bytes': source['bytes']} for source in audio_sources(s)]
+                for s in scripts
+            ]
+            mp3_bytes = sum(s['bytes'] for s in scripts)
+            for fmt in metadata['audioFormats']:
+                variant_bytes = sum(v['bytes'] if v['format'] == fmt else 0 for s in scripts for v in s['variants'])
+                if mp3_bytes and variant_bytes:
+                    print(f"🗜️  {fmt}: {variant_bytes / 1024:.0f} KB "
+                          f"({(1 - variant_bytes / mp3_bytes) * 100:.0f}% smaller than MP3)")
+        else:
+            metadata.pop('audioSources', None)
         
         # Generate manifest file
         manifest = {
-            'voice': voice,
-            'model': 'tts-1',
-            'generated': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'voice': self.voice,
+            'backend': self.backend.name,
+            'model': self.backend.model,
+            'generated': None,
             'files': [
                 {
                     'id': s['id'],
                     'filename': f"{s['id']}.mp3",
-                    'textLength': len(s['text'])
+                    'textLength': len(s['text']),
+                    'hash': s['hash'],
+                    **({'segments': [part['hash'] for part in s['parts']]} if len(s['parts']) > 1 else {}),
+                    **({'sources': audio_sources(s)} if s['variants'] else {}),
+                    'bytes': s['bytes'],
+                    'sha256': s['sha256'],
+                    **({'duration': s['duration'], 'bitrate': s['bitrate']} if 'duration' in s else {})
                 }
                 for s in scripts
             ]
         }
+        if sprite:
+            manifest['sprite'] = sprite
         
-        with open(audio_dir / 'manifest.json', 'w') as f:
-            json.dump(manifest, f, indent=2)
+        # Keep the previous timestamps unless the audio actually changed
+        previous = load_manifest(audio_dir)
+        audio_changed = {**previous, 'generated': None} != manifest or not previous.get('generated')
+        manifest['generated'] = (time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()) if audio_changed
+                                 else previous['generated'])
         
-        print(f"\n✅ All audio files generated successfully!")
-        print(f"📁 Audio files saved to: {audio_dir}")
-        print(f"📋 Manifest file created: {audio_dir}/manifest.json")
-        print(f"✨ Slideshow data updated with hasAudio: true")
+        # Update metadata
+        update_slideshow_metadata(self.slideshow_data, self.deck_dir, audio_changed)
+        update_html_file(self.slideshow_data, self.deck_dir)
         
+        with atomic_write(audio_dir / 'manifest.json', if_changed=True) as f, span('save', file='manifest.json'):
+            json.dump(manifest, f, indent=2)
+        # The page was re-rendered before the manifest existed; precache the new audio too
+        write_service_worker(self.deck_dir)
+        self.journal.remove()
+        return {}
+
+def synthesize(deck_dir='.', concurrency=4, rpm=50, max_retries=3, max_attempts=3, retry_failed=False,
+               segment=None, sprite=None, cache=None, limiter=None, backend=None, formats=None, tts_command=None):
+    """
+    Generate, verify and publish a deck's audio in this process.
+
+    Returns 0 once every slide is published, 1 if some are still missing.
+    Batch callers can pass one cache and limiter to all their decks; the
+    TTS connections are shared through tts_client's process-wide client.
+    Raises fileio.LockedError if another run holds the deck.
+    """
+    job = AudioJob(deck_dir, cache=cache, segment=segment, sprite=sprite,
+                   max_attempts=max_attempts, retry_failed=retry_failed, backend=backend, formats=formats,
+                   tts_command=tts_command)
+    
+    print(f"📚 Loaded slideshow: {job.metadata['title']}")
+    print(f"🎤 Using voice: {job.voice} ({job.backend.name} backend)\n")
+    
+    with job.lock():
+        return run_audio_job(job, concurrency, rpm if limiter is None else limiter, max_retries)
+
+def main(argv=None):
+    """Main function to generate all audio files."""
+    args = parse_args(argv)
+    print("🎙️  Generating audio files for slideshow...\n")
+    if args.endpoint:
+        configure(endpoint=args.endpoint)
+    if args.profile:
+        enable_profiling(args.profile)
+    
+    try:
+        return synthesize(args.deck, concurrency=args.concurrency, rpm=args.rpm,
+                          max_retries=args.max_retries, max_attempts=args.max_attempts,
+                          retry_failed=args.retry_failed, segment=args.segment, sprite=args.sprite,
+                          backend=args.backend, formats=args.formats, tts_command=args.tts_command)
+    except LockedError:
+        print("❌ Error: another run is already generating audio for this slideshow")
+        return 1
     except Exception as e:
         print(f"❌ Error: {e}")
         return 1
+    finally:
+        finish_profiling()
+
+def run_audio_job(job, concurrency, rate, max_retries):
+    """
+    Generate, verify and record every slide's audio while holding the deck's lock.
+
+    rate is a RateLimiter, or a requests-per-minute budget for a new one.
+    """
+    limiter = rate if isinstance(rate, RateLimiter) else RateLimiter(rate)
+    job.prepare()
+    scripts, plan = job.scripts, job.plan
+    segmented = sum(1 for s in scripts if len(s['parts']) > 1)
+    print(f"📝 Found {len(scripts)} scripts to convert"
+          + (f" ({segmented} split into sentences)" if segmented else ""))
     
+    to_generate = job.parts_to_synthesize()
+    print(f"🧮 {len(to_generate)} to synthesize, {plan.count('cached')} from cache, "
+          f"{plan.count('current')} up to date"
+          + (f", {len(job.exhausted)} skipped after repeated failures" if job.exhausted else ""))
+    if job.backend.rate_limited:
+        print(f"⚙️  Up to {concurrency} requests in flight, {limiter.max_rate:g} requests/min\n")
+    else:
+        print(f"⚙️  Up to {concurrency} clips synthesized at once\n")
+    
+    # Submit each distinct missing script or segment once, then report in slide order
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = {
+            part['hash']: executor.submit(synthesize_to_cache, part, job.voice, job.cache, limiter, max_retries,
+                                          job.backend)
+            for _, part in to_generate
+        }
+        job.start()
+        
+        for i, (script, action) in enumerate(zip(scripts, plan)):
+            print(f"[{i + 1}/{len(scripts)}] Generating {script['id']}...")
+            
+            if action == 'current':
+                print(f"   ✓ Up to date, skipping")
+                continue
+            if action == 'skip':
+                entry = job.journal.slides[script['id']]
+                print(f"   ⏭️  Skipped after {entry['attempts']} failed attempts: {entry.get('reason', '')}")
+                continue
+            
+            try:
+                pending = [futures[part['hash']] for part in script_parts(script) if part['hash'] in futures]
+                for future in pending:
+                    future.result()
+                print(f"   ✓ {job.complete(script, action, len(pending))}")
+            except Exception as e:
+                job.fail(script, e)
+                print(f"   ❌ Error: {e}")
+                continue
+    
+    if to_generate:
+        print(f"\n📈 {job.backend.summary()}")
+    
+    # Only a complete, verified set of files is published
+    print()
+    failures = job.publish()
+    if failures:
+        print(f"⚠️  {len(failures)} of {len(scripts)} slides have no audio yet:")
+        for slide_id, reason in failures.items():
+            print(f"   {slide_id}: {reason}")
+        print(f"\nThe manifest and hasAudio were left unchanged. Rerun to resume; finished slides are kept"
+              + (" (add --retry-failed to retry skipped slides)" if job.exhausted else ""))
+        return 1
+    
+    print(f"\n✅ All audio files generated successfully!")
+    print(f"📁 Audio files saved to: {job.audio_dir}")
+    print(f"📋 Manifest file created: {job.audio_dir}/manifest.json")
+    print(f"✨ Slideshow data updated with hasAudio: true")
     return 0
 
 if __name__ == '__main__':
-    # Try to load API key
-    try:
-        get_api_key()
-    except ValueError as e:
-        print(f"❌ Error: {e}")
-        print("\nExpected key file at: /Users/cam/keys/openai-key.js")
-        exit(1)
-    
     exit(main())
\ No newline at end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Keep-alive HTTP(S) transport shared by the API clients.
+
+Each worker thread keeps one persistent connection to the client's
+endpoint, so only a thread's first request pays for the TCP and TLS
+handshake. A connection the server has quietly closed is replaced once
+before a request is reported as failed.
+"""
+
+import time
+import threading
+import http.client
+from urllib.parse import urlsplit
+
+from instrumentation import span
+
+
+class KeepAliveClient:
+    """Base for clients that POST to one endpoint over per-thread connections."""
+
+    def __init__(self, endpoint, timeout=120):
+        self.timeout = timeout
+
+        url = urlsplit(endpoint)
+        self._scheme = url.scheme
+        self._host = url.hostname
+        self._port = url.port
+        self._path = url.path or '/'
+
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.stats = {
+            'connections': 0,
+            'connect_seconds': 0.0,
+        }
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn, True
+
+        if self._scheme == 'http':
+            conn = http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+        else:
+            conn = http.client.HTTPSConnection(self._host, self._port, timeout=self.timeout)
+        start = time.perf_counter()
+        with span('connect', host=self._host):
+            conn.connect()
+        elapsed = time.perf_counter() - start
+
+        self._local.conn = conn
+        with self._lock:
+            self._connections.append(conn)
+            self.stats['connections'] += 1
+            self.stats['connect_seconds'] += elapsed
+        return conn, False
+
+    def _drop_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        if conn is not None:
+            conn.close()
+            with self._lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+
+    def _post(self, body, headers):
+        """Send one request, reconnecting once if a pooled connection went stale."""
+        while True:
+            conn, reused = self._connection()
+            try:
+                conn.request('POST', self._path, body=body, headers=headers)
+                return conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                self._drop_connection()
+                if not reused:
+                    raise
+            except Exception:
+                self._drop_connection()
+                raise
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Per-stage timings and counters for the generation tools.
+
+Code marks its stages with span() and its quantities (bytes, retries,
+cache hits) with count(). Both do nothing until a profiler is enabled,
+which the tools do for --profile:
+
+    python _tools/create_slideshow.py -i notes.md -n demo --profile
+    python ../_tools/generate_audio.py --profile audio-profile.jsonl
+
+Every finished span and counter is then written as one JSON line to the
+given file (e.g. for CI to archive), and a summary of count, total, p50,
+p95 and max per stage is printed when the run ends. Spans on worker
+threads are recorded with the thread's name, so overlapping requests can
+be told apart when sizing concurrency.
+"""
+
+import json
+import math
+import time
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of values (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class Profiler:
+    """Collects span durations and counters, optionally as JSON lines."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.started = time.perf_counter()
+        self.samples = defaultdict(list)
+        self.counters = defaultdict(float)
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8') if path else None
+
+    def _emit(self, record):
+        if self._file is None:
+            return
+        line = json.dumps({
+            't': round(time.perf_counter() - self.started, 6),
+            'thread': threading.current_thread().name,
+            **record,
+        }, default=str)
+        self._file.write(line + '\n')
+
+    def record(self, stage, seconds, **fields):
+        with self._lock:
+            self.samples[stage].append(seconds)
+            self._emit({'stage': stage, 'seconds': round(seconds, 6), **fields})
+
+    def add(self, counter, amount=1, **fields):
+        with self._lock:
+            self.counters[counter] += amount
+            self._emit({'counter': counter, 'amount': amount, **fields})
+
+    def summary_lines(self):
+        """Rows of the end-of-run table, stages in order of total time."""
+        wall = time.perf_counter() - self.started
+        lines = [f"{'stage':<12} {'count':>6} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}"]
+        stages = sorted(self.samples.items(), key=lambda item: -sum(item[1]))
+        for stage, samples in stages:
+            lines.append(f"{stage:<12} {len(samples):>6} {sum(samples):>9.2f} "
+                         f"{percentile(samples, 50) * 1000:>9.1f} {percentile(samples, 95) * 1000:>9.1f} "
+                         f"{max(samples) * 1000:>9.1f}")
+        for counter, amount in sorted(self.counters.items()):
+            lines.append(f"{counter:<12} {amount:>6.0f}")
+        lines.append(f"{'wall':<12} {'':>6} {wall:>9.2f}")
+        return lines
+
+    def close(self):
+        if self._file is not None:
+            with self._lock:
+                self._emit({'stage': 'run', 'seconds': round(time.perf_counter() - self.started, 6)})
+                self._file.close()
+                self._file = None
+
+
+_profiler = None
+
+
+def enable(path=None):
+    """Start profiling; path (a file name, or True for none) receives JSON lines."""
+    global _profiler
+    _profiler = Profiler(None if path is True else path)
+    return _profiler
+
+
+def finish():
+    """Stop profiling and print the summary table, if profiling was enabled."""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is None:
+        return
+    profiler.close()
+    print("\n⏱️  Profile:")
+    for line in profiler.summary_lines():
+        print(f"   {line}")
+    if profiler.path:
+        print(f"   JSON lines written to {profiler.path}")
+
+
+@contextmanager
+def span(stage, **fields):
+    """
+    Time the enclosed block as one sample of stage.
+
+    Yields a dict of fields to record with it, which the block may add to
+    (e.g. bytes received). A block that raises is recorded with its error.
+    """
+    profiler = _profiler
+    if profiler is None:
+        yield fields
+        return
+    start = time.perf_counter()
+    try:
+        yield fields
+    except BaseException as e:
+        fields['error'] = type(e).__name__
+        raise
+    finally:
+        profiler.record(stage, time.perf_counter() - start, **fields)
+
+
+def count(counter, amount=1, **fields):
+    """Add amount to a counter (bytes, retries, cache hits...)."""
+    profiler = _profiler
+    if profiler is not None:
+        profiler.add(counter, amount, **fields)
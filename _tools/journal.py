@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Per-deck job journal for audio generation.
+
+slideshow_audio/.journal.json records every slide's state:
+- pending:   still to do
+- in-flight: submitted to the TTS pool (left over only if a run crashed)
+- done:      written and verified (size and SHA-256 recorded)
+- failed:    gave up for this run, with the reason
+
+The journal is rewritten atomically on every change, so after a crash or
+Ctrl+C the next run trusts the verified 'done' slides and redoes only the
+rest. Failed slides are retried on later runs until they have used up
+their attempts. A lock file keeps two runs from working on one deck at
+the same time.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from fileio import atomic_write, exclusive_lock
+
+JOURNAL_FILENAME = '.journal.json'
+LOCK_FILENAME = '.journal.lock'
+
+PENDING = 'pending'
+IN_FLIGHT = 'in-flight'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobJournal:
+    """Slide states for one deck's audio run."""
+
+    def __init__(self, audio_dir, max_attempts=3):
+        self.audio_dir = Path(audio_dir)
+        self.path = self.audio_dir / JOURNAL_FILENAME
+        self.max_attempts = max_attempts
+        self.slides = {}
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                self.slides = json.load(f).get('slides', {})
+
+    def lock(self):
+        """Context manager holding the deck's lock file. Raises fileio.LockedError if busy."""
+        return exclusive_lock(self.audio_dir / LOCK_FILENAME)
+
+    def start(self, scripts, retry_failed=False):
+        """
+        Line the journal up with the current scripts.
+
+        Entries whose script changed start over; slides left in flight by a
+        crashed run go back to pending. Returns the ids of slides that have
+        failed too often to be retried this run.
+        """
+        previous = self.slides
+        self.slides = {}
+        exhausted = []
+        for script in scripts:
+            entry = previous.get(script['id'])
+            if not entry or entry.get('hash') != script['hash']:
+                entry = {'hash': script['hash'], 'state': PENDING, 'attempts': 0}
+            elif entry['state'] == IN_FLIGHT:
+                entry['state'] = PENDING
+            elif entry['state'] == FAILED:
+                if retry_failed:
+                    entry['attempts'] = 0
+                if entry['attempts'] >= self.max_attempts:
+                    exhausted.append(script['id'])
+            self.slides[script['id']] = entry
+        self.save()
+        return exhausted
+
+    def completed(self):
+        """Manifest-style entries for slides recorded as done."""
+        return [
+            {'id': slide_id, **{k: v for k, v in entry.items() if k not in ('state', 'attempts', 'updated')}}
+            for slide_id, entry in self.slides.items() if entry['state'] == DONE
+        ]
+
+    def mark(self, slide_ids, state, reason=None, **details):
+        """Move slides to a new state and persist the journal."""
+        for slide_id in slide_ids:
+            entry = self.slides[slide_id]
+            if state == IN_FLIGHT:
+                entry['attempts'] = entry.get('attempts', 0) + 1
+            entry['state'] = state
+            entry['updated'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            entry.pop('reason', None)
+            if reason:
+                entry['reason'] = reason
+            entry.update(details)
+        self.save()
+
+    def counts(self):
+        counts = {PENDING: 0, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+        for entry in self.slides.values():
+            counts[entry['state']] += 1
+        return counts
+
+    def failures(self):
+        return {slide_id: entry.get('reason', '') for slide_id, entry in self.slides.items()
+                if entry['state'] == FAILED}
+
+    def save(self):
+        with atomic_write(self.path) as f:
+            json.dump({'slides': self.slides}, f, indent=2)
+
+    def remove(self):
+        """Drop the journal once its results are recorded in the manifest."""
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Pluggable chat-completion client for turning notes into slides.
+
+ChatClient talks to any OpenAI-compatible /v1/chat/completions endpoint
+over per-thread keep-alive connections. The endpoint and model can be
+changed with SLIDES_LLM_ENDPOINT and SLIDES_LLM_MODEL, e.g. to run against
+_tools/mock_server.py. Anything with a `name` and a `complete(prompt)`
+method returning text can be passed to the transform instead.
+"""
+
+import os
+import json
+import time
+import threading
+
+from http_pool import KeepAliveClient
+from instrumentation import count, span
+from tts_client import RETRYABLE_STATUSES, get_api_key, parse_retry_after
+
+CHAT_ENDPOINT = 'https://api.openai.com/v1/chat/completions'
+DEFAULT_MODEL = 'gpt-4o-mini'
+
+ENDPOINT_ENV = 'SLIDES_LLM_ENDPOINT'
+MODEL_ENV = 'SLIDES_LLM_MODEL'
+
+
+class LLMError(Exception):
+    """Error returned by the chat completions API."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status in RETRYABLE_STATUSES
+
+
+class ChatClient(KeepAliveClient):
+    """Chat completions client holding one keep-alive connection per thread."""
+
+    def __init__(self, api_key=None, endpoint=CHAT_ENDPOINT, model=DEFAULT_MODEL, timeout=300,
+                 max_retries=3):
+        super().__init__(endpoint, timeout)
+        self.api_key = api_key or get_api_key()
+        self.model = model
+        self.max_retries = max_retries
+        self.stats.update({'requests': 0, 'request_seconds': 0.0})
+
+    @property
+    def name(self):
+        """Identifies the model in cache keys."""
+        return self.model
+
+    def _request(self, prompt, temperature):
+        body = json.dumps({
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'temperature': temperature,
+            'response_format': {'type': 'json_object'},
+        }).encode('utf-8')
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
+        }
+
+        start = time.perf_counter()
+        with span('llm', model=self.model, chars=len(prompt)) as fields:
+            response = self._post(body, headers)
+            try:
+                data = response.read()
+            except Exception:
+                self._drop_connection()
+                raise
+            fields.update(status=response.status, bytes=len(data))
+        if response.will_close:
+            self._drop_connection()
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['request_seconds'] += time.perf_counter() - start
+
+        if response.status != 200:
+            raise LLMError(
+                f"API error {response.status}: {data.decode('utf-8', 'replace')}",
+                status=response.status,
+                retry_after=parse_retry_after(response.getheader('Retry-After'))
+            )
+        try:
+            return json.loads(data)['choices'][0]['message']['content']
+        except (ValueError, KeyError, IndexError) as e:
+            raise LLMError(f"Unexpected response: {e}")
+
+    def complete(self, prompt, temperature=0.2):
+        """Send one prompt and return the reply text, retrying when throttled."""
+        attempt = 0
+        while True:
+            try:
+                return self._request(prompt, temperature)
+            except LLMError as e:
+                if not e.retryable or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                count('llm_retries', status=e.status)
+                time.sleep(e.retry_after if e.retry_after is not None else 2 ** attempt)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_llm_client():
+    """Return the process-wide chat client, or None when no API key is available."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            try:
+                _default_client = ChatClient(
+                    endpoint=os.environ.get(ENDPOINT_ENV) or CHAT_ENDPOINT,
+                    model=os.environ.get(MODEL_ENV) or DEFAULT_MODEL,
+                )
+            except ValueError:
+                return None
+        return _default_client
+
+
+def set_llm_client(client):
+    """Use client (anything with name and complete()) for subsequent transforms."""
+    global _default_client
+    with _default_lock:
+        _default_client = client
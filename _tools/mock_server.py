@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI endpoints the tools call.
+
+Serves:
+- POST /v1/audio/speech: valid (silent) MP3 frames, sized like real speech
+  for the input text (other response_formats get placeholder bytes of a
+  typical size)
+- POST /v1/chat/completions: a chat completion whose content is slideshow
+  JSON (or, for the extract-points prompt, a section's key points) built
+  from the text in the prompt's first code block
+
+Latency, jitter, the share of requests answered with 429 and the payload
+size are configurable, so the generation pipeline can be exercised and
+benchmarked offline. Point the tools at it with:
+
+    SLIDES_TTS_ENDPOINT=http://localhost:8900/v1/audio/speech OPENAI_API_KEY=mock \\
+        python ../_tools/generate_audio.py
+
+Usage:
+    python _tools/mock_server.py
+    python _tools/mock_server.py --port 8900 --latency 400 --jitter 150 --rate-limit 0.05
+"""
+
+import re
+import json
+import time
+import random
+import argparse
+import threading
+import http.server
+from datetime import datetime
+
+from mp3 import silence
+
+PORT = 8900
+
+# Typical narration speed of the speech endpoint at 1x
+CHARS_PER_SECOND = 15
+
+# Content type and size relative to MP3 of each response_format. Only MP3
+# is real audio; the others are placeholders with realistic sizes.
+FORMATS = {
+    'mp3': ('audio/mpeg', 1.0),
+    'opus': ('audio/ogg', 0.3),
+    'aac': ('audio/aac', 0.6),
+    'flac': ('audio/flac', 4.0),
+}
+
+
+class MockSettings:
+    """Behaviour shared by all handler threads."""
+
+    def __init__(self, latency=0.3, jitter=0.1, rate_limit=0.0, retry_after=1,
+                 payload_scale=1.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.payload_scale = payload_scale
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'speech': 0, 'chat': 0, 'throttled': 0, 'bytes': 0}
+
+    def delay(self):
+        with self._lock:
+            jitter = self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, self.latency + jitter))
+
+    def throttle(self):
+        with self._lock:
+            throttled = self._random.random() < self.rate_limit
+            if throttled:
+                self.stats['throttled'] += 1
+        return throttled
+
+    def count(self, kind, size):
+        with self._lock:
+            self.stats[kind] += 1
+            self.stats['bytes'] += size
+
+
+def speech_audio(text, payload_scale=1.0):
+    """Silent MP3 about as long as the text would take to read aloud."""
+    seconds = max(0.5, len(text) / CHARS_PER_SECOND) * payload_scale
+    return silence(seconds)
+
+
+def slideshow_from_text(text):
+    """Slideshow JSON with one content slide per paragraph of text."""
+    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()] or ['(empty input)']
+    slides = []
+    for i, paragraph in enumerate(paragraphs[:20]):
+        words = paragraph.split()
+        slides.append({
+            'id': i + 1,
+            'type': 'content',
+            'title': ' '.join(words[:6]),
+            'content': [' '.join(words[j:j + 8]) for j in range(0, min(len(words), 24), 8)],
+            'script': paragraph,
+        })
+    return {
+        'metadata': {
+            'title': 'Mock Presentation',
+            'subtitle': 'Generated by the mock server',
+            'author': '',
+            'date': datetime.now().strftime('%Y-%m-%d'),
+            'category': 'Technical',
+            'duration': f"{max(1, len(slides) // 2)} min",
+            'voice': 'shimmer',
+            'hasAudio': False,
+            'titleScript': f"This presentation covers {len(slides)} topics.",
+        },
+        'slides': slides,
+    }
+
+
+def prompt_content(prompt):
+    """The input text inside a prompt's first code block (or the whole prompt)."""
+    match = re.search(r'^```[^\n]*\n(.*?)\n```', prompt, re.DOTALL | re.MULTILINE)
+    return match.group(1) if match else prompt
+
+
+def points_from_text(text):
+    """Extract-points reply: one point per paragraph of the section."""
+    paragraphs = [p.strip() for p in text.split('\n\n') if p.strip()] or ['(empty section)']
+    return {
+        'heading': ' '.join(paragraphs[0].lstrip('#').split()[:6]),
+        'points': [' '.join(p.split()[:30]) for p in paragraphs[:8]],
+        'examples': [],
+        'data': re.findall(r'\d+(?:\.\d+)?%?', text)[:5],
+    }
+
+
+def chat_reply(prompt):
+    content = prompt_content(prompt)
+    if '"points"' in prompt:
+        return points_from_text(content)
+    return slideshow_from_text(content)
+
+
+class MockHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # Set by serve()
+    settings = None
+    quiet = True
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self.send_json(400, {'error': {'message': 'Invalid JSON body'}})
+            return
+
+        self.settings.delay()
+        if self.settings.throttle():
+            self.send_json(429, {'error': {'message': 'Rate limit reached (mock)'}},
+                           {'Retry-After': str(self.settings.retry_after)})
+            return
+
+        if self.path.startswith('/v1/audio/speech'):
+            content_type, ratio = FORMATS.get(payload.get('response_format') or 'mp3', FORMATS['mp3'])
+            audio = speech_audio(payload.get('input', ''), self.settings.payload_scale)
+            if ratio != 1.0:
+                audio = (audio * 4)[:int(len(audio) * ratio)]
+            self.settings.count('speech', len(audio))
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(audio)))
+            self.end_headers()
+            self.wfile.write(audio)
+        elif self.path.startswith('/v1/chat/completions'):
+            messages = payload.get('messages') or [{}]
+            content = json.dumps(chat_reply(messages[-1].get('content', '')))
+            body = {
+                'id': 'chatcmpl-mock',
+                'object': 'chat.completion',
+                'model': payload.get('model', 'mock'),
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop',
+                }],
+            }
+            self.settings.count('chat', len(content))
+            self.send_json(200, body)
+        else:
+            self.send_json(404, {'error': {'message': f"Unknown endpoint {self.path}"}})
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def serve(settings, port=0, quiet=True):
+    """Start the mock server on a background thread. Returns the server."""
+    handler = type('Handler', (MockHandler,), {'settings': settings, 'quiet': quiet})
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock OpenAI speech and chat endpoints')
+    parser.add_argument('--port', '-p', type=int, default=PORT, help=f'Port to listen on (default: {PORT})')
+    parser.add_argument('--latency', type=float, default=300, help='Response latency in ms (default: 300)')
+    parser.add_argument('--jitter', type=float, default=100, help='Random +/- latency in ms (default: 100)')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='Fraction of requests answered with 429 (default: 0)')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s (default: 1)')
+    parser.add_argument('--payload-scale', type=float, default=1.0,
+                        help='Multiply the length of generated audio (default: 1.0)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+    args = parser.parse_args()
+
+    settings = MockSettings(args.latency / 1000, args.jitter / 1000, args.rate_limit,
+                            args.retry_after, args.payload_scale, args.seed)
+    server = serve(settings, args.port, quiet=False)
+    print(f"🧪 Mock OpenAI server at http://localhost:{server.server_port}")
+    print(f"   Speech: http://localhost:{server.server_port}/v1/audio/speech")
+    print(f"   Chat:   http://localhost:{server.server_port}/v1/chat/completions")
+    print("\nPress Ctrl+C to stop the server\n")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\n✅ Server stopped ({settings.stats['speech']} speech, {settings.stats['chat']} chat, "
+              f"{settings.stats['throttled']} throttled)")
+
+
+if __name__ == '__main__':
+    main()
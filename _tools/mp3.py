@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Pure-Python MPEG audio frame scanning and splicing.
+
+Only frame headers are parsed; audio is never decoded or re-encoded.
+Leading ID3v2 tags, trailing ID3v1 tags and Xing/Info/VBRI metadata
+frames are skipped, so frames from several files can be concatenated
+into one playable stream.
+"""
+
+import os
+from collections import namedtuple
+from pathlib import Path
+
+from fileio import atomic_write
+
+# Bitrates in kbps, indexed by [version_key][layer][bitrate_index]
+_BITRATES = {
+    'V1': {
+        1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    'V2': {
+        1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+
+_SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    2.5: [11025, 12000, 8000],
+}
+
+_VERSIONS = {0b00: 2.5, 0b10: 2, 0b11: 1}
+_LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+
+FrameHeader = namedtuple(
+    'FrameHeader',
+    'version layer bitrate sample_rate padding channels frame_length samples'
+)
+Frame = namedtuple('Frame', 'offset header')
+
+
+def parse_header(data):
+    """Parse a 4-byte frame header, or return None if it isn't one."""
+    if len(data) < 4 or data[0] != 0xFF or (data[1] & 0xE0) != 0xE0:
+        return None
+    version = _VERSIONS.get((data[1] >> 3) & 0b11)
+    layer = _LAYERS.get((data[1] >> 1) & 0b11)
+    bitrate_index = data[2] >> 4
+    rate_index = (data[2] >> 2) & 0b11
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = _BITRATES['V1' if version == 1 else 'V2'][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (data[2] >> 1) & 1
+    channels = 1 if (data[3] >> 6) == 0b11 else 2
+
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or version == 1:
+        samples = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        frame_length = 72 * bitrate // sample_rate + padding
+
+    return FrameHeader(version, layer, bitrate, sample_rate, padding, channels, frame_length, samples)
+
+
+# MPEG-2 Layer III, 160 kbps, 24 kHz, mono: 480-byte frames of 576 samples,
+# the format the speech endpoint returns
+SILENT_FRAME_HEADER = bytes([0xFF, 0xF3, 0xE4, 0xC4])
+
+
+def silence(seconds, header=SILENT_FRAME_HEADER):
+    """Return an MP3 stream of about the given length whose frames carry no audio data."""
+    frame = parse_header(header)
+    count = max(1, round(seconds * frame.sample_rate / frame.samples))
+    return (header + bytes(frame.frame_length - len(header))) * count
+
+
+def _id3v2_size(head):
+    """Total size of an ID3v2 tag starting at head, or 0."""
+    if len(head) < 10 or head[:3] != b'ID3':
+        return 0
+    size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _is_metadata_frame(f, frame):
+    """True for a Xing/Info/VBRI header frame, which carries no audio."""
+    f.seek(frame.offset)
+    data = f.read(min(frame.header.frame_length, 64))
+    return b'Xing' in data or b'Info' in data or b'VBRI' in data
+
+
+def scan_frames(path):
+    """
+    Yield the audio frames of an MP3 file.
+
+    Only the 4 header bytes of each frame are read; the file position then
+    jumps to the next frame. Garbage between frames is skipped by searching
+    for the next valid header that is followed by another valid header.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        offset = _id3v2_size(f.read(10))
+        end = size
+        if size >= 128:
+            f.seek(size - 128)
+            if f.read(3) == b'TAG':
+                end = size - 128
+
+        first = True
+        while offset + 4 <= end:
+            f.seek(offset)
+            header = parse_header(f.read(4))
+            if header is None or header.frame_length < 4 or offset + header.frame_length > end:
+                offset = _resync(f, offset + 1, end)
+                if offset is None:
+                    return
+                continue
+
+            frame = Frame(offset, header)
+            skip = first and _is_metadata_frame(f, frame)
+            first = False
+            if not skip:
+                yield frame
+            offset += header.frame_length
+
+
+def _resync(f, offset, end):
+    """Find the next offset holding two consecutive valid frame headers."""
+    while offset + 4 <= end:
+        f.seek(offset)
+        window = f.read(min(64 * 1024, end - offset))
+        position = window.find(b'\xff')
+        while position != -1:
+            candidate = offset + position
+            f.seek(candidate)
+            header = parse_header(f.read(4))
+            if header and header.frame_length >= 4:
+                following = candidate + header.frame_length
+                if following == end:
+                    return candidate
+                f.seek(following)
+                if following + 4 <= end and parse_header(f.read(4)):
+                    return candidate
+            position = window.find(b'\xff', position + 1)
+        offset += max(1, len(window) - 3)
+    return None
+
+
+def audio_info(path):
+    """Return frame count, duration (seconds), average bitrate and format of a file."""
+    frames = 0
+    samples = 0
+    audio_bytes = 0
+    sample_rate = None
+    version = layer = None
+    for frame in scan_frames(path):
+        frames += 1
+        samples += frame.header.samples
+        audio_bytes += frame.header.frame_length
+        sample_rate = frame.header.sample_rate
+        version, layer = frame.header.version, frame.header.layer
+    duration = samples / sample_rate if sample_rate else 0.0
+    return {
+        'frames': frames,
+        'duration': duration,
+        'bitrate': round(audio_bytes * 8 / duration) if duration else 0,
+        'sampleRate': sample_rate,
+        'version': version,
+        'layer': layer,
+    }
+
+
+def splice(sources, destination):
+    """
+    Concatenate the audio frames of several MP3 files into destination.
+
+    All sources must share MPEG version, layer and sample rate. Returns one
+    segment per source with its byte, frame and time offsets in the output.
+    A destination that already holds the same frames is left untouched.
+    """
+    segments = []
+    stream_format = None
+    byte_offset = 0
+    frame_offset = 0
+    time_offset = 0.0
+
+    with atomic_write(destination, binary=True, if_changed=True) as out:
+        for source in sources:
+            frames = 0
+            samples = 0
+            start_bytes = byte_offset
+            with open(source, 'rb') as f:
+                for frame in scan_frames(source):
+                    header = frame.header
+                    current = (header.version, header.layer, header.sample_rate)
+                    if stream_format is None:
+                        stream_format = current
+                    elif current != stream_format:
+                        raise ValueError(f"{Path(source).name} doesn't match the format of the other files")
+                    f.seek(frame.offset)
+                    out.write(f.read(header.frame_length))
+                    byte_offset += header.frame_length
+                    frames += 1
+                    samples += header.samples
+
+            duration = samples / stream_format[2] if frames else 0.0
+            segments.append({
+                'byteOffset': start_bytes,
+                'byteLength': byte_offset - start_bytes,
+                'frameOffset': frame_offset,
+                'frames': frames,
+                'start': round(time_offset, 3),
+                'duration': round(duration, 3),
+            })
+            frame_offset += frames
+            time_offset += duration
+
+    return segments
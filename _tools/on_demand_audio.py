@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Narrate slides one at a time, as the preview player asks for them.
+
+preview_slideshow.py --narrate answers a request for a deck's
+slideshow_audio/slide-N.mp3 with the audio of the slide's current script,
+straight from the content-addressed audio cache: a clip already cached
+(or published in the deck and vouched for by its manifest) is reused,
+anything else is synthesized with the same keys, backends and cache as
+generate_audio.py. While the slide plays, the next few slides are
+synthesized in the background, so an author hears slide 1 within seconds
+instead of waiting for the whole deck.
+
+Nothing in the deck is written, so previewing never races a
+generate_audio.py or schedule_audio.py run that holds the deck's lock.
+hasAudio, durations and manifest.json are still published by
+generate_audio.py, which then finds every previewed clip in the cache
+and finishes without synthesizing them again.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from audio_cache import AudioCache
+from generate_audio import (extract_scripts, key_scripts, load_manifest, load_slideshow_data, splice_to_cache,
+                            synthesize_to_cache, verify_audio)
+from instrumentation import span
+from rate_limiter import RateLimiter
+from tts_backends import get_backend
+
+DEFAULT_PREFETCH = 2
+
+
+class OnDemandNarrator:
+    """Synthesizes single slides of any deck into the cache, each distinct clip at most once at a time."""
+
+    def __init__(self, backend=None, prefetch=DEFAULT_PREFETCH, workers=4, rpm=50, max_retries=3, cache=None,
+                 tts_command=None):
+        self.backend_name = backend
+        self.tts_command = tts_command
+        self.prefetch_count = prefetch
+        self.max_retries = max_retries
+        self.cache = cache or AudioCache()
+        self.cache.remove_stale_parts()
+        self.limiter = RateLimiter(rpm)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='narrate')
+        self._pending = {}
+        self._decks = {}
+        self._lock = threading.Lock()
+
+    def _deck(self, deck_dir):
+        """Keyed scripts, backend and voice of a deck, re-read only when its slideshow_data.json changes."""
+        data_path = Path(deck_dir).resolve() / 'slideshow_data.json'
+        stat = data_path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._decks.get(data_path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        slideshow_data = load_slideshow_data(data_path.parent)
+        metadata = slideshow_data['metadata']
+        backend = get_backend(self.backend_name or metadata.get('ttsBackend'), self.tts_command)
+        voice = metadata.get('voice', 'shimmer')
+        scripts = extract_scripts(slideshow_data)
+        key_scripts(scripts, voice, bool(metadata.get('segmentAudio')), backend.model)
+        deck = (scripts, backend, voice)
+        with self._lock:
+            self._decks[data_path] = (stamp, deck)
+        return deck
+
+    def _adopt_published(self, deck_dir, script):
+        """Copy a published clip the cache has lost into it, if the deck's manifest vouches for it."""
+        audio_dir = Path(deck_dir) / 'slideshow_audio'
+        entry = next((f for f in load_manifest(audio_dir)['files'] if f.get('id') == script['id']), None)
+        if entry and entry.get('hash') == script['hash'] and verify_audio(audio_dir / entry['filename'], entry):
+            return self.cache.put_file(script['hash'], audio_dir / entry['filename'])
+        return None
+
+    def _produce(self, deck_dir, script, backend, voice):
+        """Synthesize (or adopt) a slide's audio into the cache. Runs on a worker thread."""
+        blob = self.cache.get(script['hash']) or self._adopt_published(deck_dir, script)
+        if blob:
+            return blob
+        with span('narrate', deck=Path(deck_dir).resolve().name, slide=script['id']):
+            for part in script['parts']:
+                if not self.cache.get(part['hash']):
+                    synthesize_to_cache(part, voice, self.cache, self.limiter, self.max_retries, backend)
+            if len(script['parts']) > 1 and not self.cache.get(script['hash']):
+                splice_to_cache(script, self.cache)
+        print(f"🎙️  Narrated {Path(deck_dir).resolve().name}/{script['id']}.mp3 ({backend.name})")
+        return self.cache.path_for(script['hash'])
+
+    def _submit(self, deck_dir, script, backend, voice):
+        key = script['hash']
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._produce, deck_dir, script, backend, voice)
+                self._pending[key] = future
+                future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def audio_for(self, deck_dir, index):
+        """
+        Return the cached audio of the deck's slide index, waiting for it if
+        needed, and queue the next slides.
+
+        Raises tts_backends.BackendError if no engine is available,
+        tts_client.TTSError if synthesis fails, IndexError for a slide the
+        deck doesn't have.
+        """
+        scripts, backend, voice = self._deck(deck_dir)
+        if not 0 <= index < len(scripts):
+            raise IndexError(f"{Path(deck_dir).name} has no slide {index}")
+        for script in scripts[index + 1:index + 1 + self.prefetch_count]:
+            if not self.cache.get(script['hash']):
+                self._submit(deck_dir, script, backend, voice)
+        # Range requests while a clip plays end here, with one stat
+        blob = self.cache.get(scripts[index]['hash'])
+        if blob:
+            return blob
+        return self._submit(deck_dir, scripts[index], backend, voice).result()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate limiter shared by the audio generation tools.
+
+The limiter hands out one token per request at a configurable
+requests-per-minute rate. When the API pushes back (HTTP 429 or a
+Retry-After header) every worker is paused and the rate is halved, then
+recovered gradually as requests succeed again.
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe token bucket with adaptive (AIMD) backoff."""
+
+    def __init__(self, requests_per_minute=50, burst=1, min_rate=1):
+        if requests_per_minute <= 0:
+            raise ValueError("requests_per_minute must be positive")
+
+        self.max_rate = float(requests_per_minute)
+        self.min_rate = float(min(min_rate, requests_per_minute))
+        self.rate = self.max_rate
+        self.burst = max(1, int(burst))
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._failures = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate / 60.0)
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) * 60.0 / self.rate
+            time.sleep(wait)
+
+    def penalize(self, retry_after=None):
+        """Pause all callers after a throttling response and slow down."""
+        with self._lock:
+            self._failures += 1
+            if retry_after is None:
+                retry_after = min(60.0, 2.0 ** self._failures)
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + retry_after)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._updated = now
+            return retry_after
+
+    def reward(self):
+        """Record a successful request and creep back towards the full rate."""
+        with self._lock:
+            self._failures = 0
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Generate narration for many decks under one shared rate and concurrency budget.
+
+All missing audio from every deck goes into a single prioritized queue
+served by one worker pool, one rate limiter and one set of keep-alive
+connections, so the account's quota is used fully without being exceeded
+(separate generate_audio.py processes can't see each other's traffic).
+
+Priority:
+1. Decks named with --first, then decks whose metadata.presentationDate
+   is within --soon days (soonest first)
+2. Title slides of every other deck, so each deck can at least open
+3. Everything else, newest deck (metadata.date) first
+
+Decks narrated with a local or fake backend (see tts_backends.py) share
+the worker pool but not the rate limit.
+
+Each deck keeps its own journal and lock (see journal.py) and is published
+(manifest, hasAudio, HTML) as soon as all of its slides are verified.
+
+Usage:
+    python _tools/schedule_audio.py                  # every deck in the collection
+    python _tools/schedule_audio.py deck-a deck-b --rpm 100 -j 8
+    python _tools/schedule_audio.py --first board-review --soon 2
+"""
+
+import sys
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from datetime import date
+from pathlib import Path
+
+from audio_cache import AudioCache
+from build_all import BASE_PATH, find_decks
+from fileio import LockedError
+from instrumentation import enable as enable_profiling, finish as finish_profiling
+from generate_audio import AudioJob, script_parts, synthesize_to_cache
+from rate_limiter import RateLimiter
+from tts_backends import BACKENDS
+from tts_client import configure
+
+
+def resolve_deck(name):
+    """Accept a deck directory name (relative to the collection) or a path."""
+    path = Path(name)
+    if not (path / 'slideshow_data.json').exists():
+        path = BASE_PATH / name
+    if not (path / 'slideshow_data.json').exists():
+        raise FileNotFoundError(f"No slideshow_data.json in {name}")
+    return path
+
+
+def deck_sort_key(job, first, soon_days, today):
+    """Sort key ordering decks by urgency. The first element is 0 or 1 for urgent decks."""
+    name = job.deck_dir.resolve().name
+    if name in first:
+        return (0, first.index(name))
+    presenting = job.metadata.get('presentationDate')
+    if presenting:
+        try:
+            days = (date.fromisoformat(presenting) - today).days
+        except ValueError:
+            days = None
+        if days is not None and 0 <= days <= soon_days:
+            return (1, days)
+    try:
+        created = date.fromisoformat(job.metadata.get('date', '')).toordinal()
+    except ValueError:
+        created = 0
+    # Newest first
+    return (2, -created)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Generate audio for many slideshows under one rate budget')
+    parser.add_argument('decks', nargs='*', help='Deck directories (default: every deck in the collection)')
+    parser.add_argument('--concurrency', '-j', type=int, default=4,
+                        help='Maximum number of TTS requests in flight across all decks (default: 4)')
+    parser.add_argument('--rpm', type=float, default=50,
+                        help='Maximum TTS requests per minute across all decks (default: 50)')
+    parser.add_argument('--max-retries', type=int, default=3,
+                        help='Retries per request after throttling or server errors (default: 3)')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                        help='Runs in which a failing slide is retried before it is skipped (default: 3)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Retry slides that were skipped after repeated failures')
+    parser.add_argument('--first', action='append', default=[],
+                        help='Deck to do before all others (repeatable, in order)')
+    parser.add_argument('--soon', type=int, default=1,
+                        help='Treat decks presenting within this many days as urgent (default: 1)')
+    parser.add_argument('--endpoint', default=None,
+                        help='Speech endpoint URL (default: OpenAI, or $SLIDES_TTS_ENDPOINT)')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default=None,
+                        help='TTS engine for every deck (default: each deck\'s metadata.ttsBackend, else openai)')
+    parser.add_argument('--tts-command', default=None, metavar='COMMAND',
+                        help='Synthesizer command for the local backend (default: $SLIDES_TTS_COMMAND, '
+                             'else espeak-ng piped into lame)')
+    parser.add_argument('--profile', nargs='?', const=True, metavar='FILE',
+                        help='Print per-stage timings at the end, and write them to FILE as JSON lines')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print("🗓️  Scheduling audio generation across slideshows...\n")
+    if args.endpoint:
+        configure(endpoint=args.endpoint)
+    if args.profile:
+        enable_profiling(args.profile)
+    try:
+        return schedule(args)
+    finally:
+        finish_profiling()
+
+
+def schedule(args):
+    """Plan, synthesize and publish every deck named in args."""
+    deck_paths = [resolve_deck(name) for name in args.decks] if args.decks else find_decks()
+    cache = AudioCache()
+    limiter = RateLimiter(args.rpm)
+
+    with ExitStack() as stack:
+        # Lock and plan every deck up front
+        jobs = []
+        for deck_path in deck_paths:
+            try:
+                job = AudioJob(deck_path, cache=cache, max_attempts=args.max_attempts,
+                               retry_failed=args.retry_failed, backend=args.backend,
+                               tts_command=args.tts_command)
+                stack.enter_context(job.lock())
+                job.prepare()
+            except LockedError:
+                print(f"⚠️  Skipping {deck_path.name}: another run is generating its audio")
+                continue
+            except Exception as e:
+                print(f"❌ Skipping {deck_path.name}: {e}")
+                continue
+            jobs.append(job)
+
+        today = date.today()
+        jobs.sort(key=lambda job: deck_sort_key(job, args.first, args.soon, today))
+
+        # One queue for the whole collection, in priority order
+        work = []
+        for deck_order, job in enumerate(jobs):
+            urgent = deck_sort_key(job, args.first, args.soon, today)[0] < 2
+            for index, part in job.parts_to_synthesize():
+                tier = 0 if urgent else (1 if index == 0 else 2)
+                work.append(((tier, deck_order, index), job, part))
+        work.sort(key=lambda item: item[0])
+
+        # Slides wait on the set of parts (possibly shared between decks) they need
+        waiting = {}
+        remaining = {}
+        for job in jobs:
+            job.start()
+            remaining[id(job)] = {}
+            for script, action in zip(job.scripts, job.plan):
+                if action in ('generate', 'cached'):
+                    remaining[id(job)][script['id']] = {part['hash'] for part in script_parts(script)}
+                    for part in script_parts(script):
+                        waiting.setdefault(part['hash'], []).append((job, script, action))
+
+        total_requests = len({part['hash'] for _, _, part in work})
+        slides = sum(len(r) for r in remaining.values())
+        print(f"📚 {len(jobs)} slideshows, {slides} slides to produce, {total_requests} requests to make")
+        print(f"⚙️  Up to {args.concurrency} requests in flight, {args.rpm:g} requests/min in total\n")
+
+        published = []
+        incomplete = {}
+
+        def finish_part(part_hash, error=None):
+            """Complete every slide whose last missing part just arrived."""
+            for job, script, action in waiting.pop(part_hash, []):
+                pending = (remaining[id(job)] or {}).get(script['id'])
+                if pending is None:
+                    continue
+                pending.discard(part_hash)
+                if error is not None:
+                    job.fail(script, error)
+                    del remaining[id(job)][script['id']]
+                    print(f"   ❌ {job.deck_dir.name}/{script['id']}: {error}")
+                elif not pending:
+                    try:
+                        message = job.complete(script, action, len(script['parts']))
+                        print(f"   ✓ {job.deck_dir.name}/{script['id']}: {message}")
+                    except Exception as e:
+                        job.fail(script, e)
+                        print(f"   ❌ {job.deck_dir.name}/{script['id']}: {e}")
+                    del remaining[id(job)][script['id']]
+                if not remaining[id(job)]:
+                    publish(job)
+
+        def publish(job):
+            remaining[id(job)] = None
+            try:
+                failures = job.publish()
+            except Exception as e:
+                failures = {'publish': str(e)}
+            if failures:
+                incomplete[job.deck_dir.name] = failures
+                print(f"⚠️  {job.deck_dir.name}: {len(failures)} slides still missing, not published")
+            else:
+                published.append(job.deck_dir.name)
+                print(f"✅ {job.deck_dir.name}: published ({len(job.scripts)} slides)")
+
+        # Parts that are already cached (or shared with a finished slide) need no request
+        queued = {part['hash'] for _, _, part in work}
+        for part_hash in [h for h in waiting if h not in queued]:
+            finish_part(part_hash)
+        for job in jobs:
+            if remaining[id(job)] == {}:
+                publish(job)
+
+        start = time.monotonic()
+        done = 0
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+            futures = {}
+            for _, job, part in work:
+                if part['hash'] not in queued:
+                    continue
+                queued.discard(part['hash'])
+                future = executor.submit(synthesize_to_cache, part, job.voice, cache, limiter, args.max_retries,
+                                         job.backend)
+                futures[future] = part['hash']
+
+            for future in as_completed(futures):
+                done += 1
+                try:
+                    future.result()
+                    error = None
+                except Exception as e:
+                    error = e
+                elapsed = time.monotonic() - start
+                rate = done / elapsed * 60 if elapsed else 0.0
+                eta = (total_requests - done) / (done / elapsed) if done and elapsed else 0.0
+                print(f"[{done}/{total_requests}] {rate:.0f} requests/min, ~{eta:.0f}s left")
+                finish_part(futures[future], error)
+
+    if total_requests:
+        for backend in {id(job.backend): job.backend for job in jobs}.values():
+            print(f"\n📈 {backend.name}: {backend.summary()}")
+    print(f"\n📊 {len(published)} slideshows published, {len(incomplete)} incomplete")
+    for name, failures in incomplete.items():
+        for slide_id, reason in failures.items():
+            print(f"   {name}/{slide_id}: {reason}")
+    if incomplete:
+        print("\nRerun to resume; finished slides are kept")
+        return 1
+    print("\n✅ Scheduling complete!")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Cross-deck search index for the collection page.
+
+Every deck's metadata and its slides' titles, bullets, examples and
+narration scripts are tokenized into an inverted index written to search/:
+- search/index.json lists the decks and their slide titles, maps each
+  term's first character to the shard holding those terms, and carries
+  the tokenizing rules (pattern, minimum length, stopwords) so queries
+  are split the way the decks were
+- search/terms.<hash>.json shards hold {term: [deck, slide, score, ...]}
+The root index.html fetches index.json the first time the search box is
+used, then only the shards for the prefixes being typed, so partial words
+match too.
+
+Decks generated by create_slideshow.py are read from slideshow_data.json;
+older hand-built decks that only embed `const slideshowData = {...}` in
+their index.html are indexed from that object (its top-level title and
+subtitle stand in for the metadata). Their pages don't understand #slide-N,
+so their results link to the deck itself.
+
+Tokenizing a deck is the slow part, so each deck's postings are cached in
+_cache/search/ by the digest of its data, and a rebuild only re-reads the
+decks that changed. Shards have content-hashed names,
+so unchanged shards keep their file (and browser cache) across rebuilds.
+"""
+
+import re
+import json
+import html
+import hashlib
+from collections import defaultdict
+from pathlib import Path
+
+from assets import remove_stale, write_hashed
+from fileio import atomic_write
+
+BASE_PATH = Path(__file__).parent.parent
+SEARCH_DIR = BASE_PATH / 'search'
+CACHE_DIR = BASE_PATH / '_cache' / 'search'
+
+# Bump when tokenizing or scoring changes, so cached postings are rebuilt
+INDEX_VERSION = 1
+
+PREFIX_LENGTH = 1
+MIN_TOKEN_LENGTH = 2
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+# TOKEN_PATTERN in JavaScript syntax (used with the 'u' flag), so queries split the same way
+BROWSER_TOKEN_PATTERN = r'[\p{L}\p{N}]+'
+TAG_PATTERN = re.compile(r'<[^>]+>')
+INLINE_DATA_PATTERN = re.compile(r'\b(?:const|let|var)\s+slideshowData\s*=\s*(?=\{)')
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have in is it its of on or so
+    that the their them then there these they this to was we were will with
+    you your our us can do not what which how
+""".split())
+
+# Weight of a term occurrence by field
+DECK_FIELDS = {'title': 4, 'subtitle': 2, 'author': 2, 'category': 1, 'titleScript': 1}
+SLIDE_FIELDS = {'title': 3, 'subtitle': 2, 'content': 2, 'example': 1, 'script': 1}
+
+
+def tokenize(text):
+    """Lowercase word tokens of text, without markup or stopwords."""
+    text = html.unescape(TAG_PATTERN.sub(' ', text)).lower()
+    return [token for token in TOKEN_PATTERN.findall(text)
+            if len(token) >= MIN_TOKEN_LENGTH and token not in STOPWORDS]
+
+
+def field_text(value):
+    if isinstance(value, list):
+        return ' '.join(field_text(item) for item in value)
+    return value if isinstance(value, str) else ''
+
+
+def index_deck(slideshow_data):
+    """Slide titles and {term: {slide: score}} for one deck; slide 0 is the title slide."""
+    metadata = slideshow_data.get('metadata', slideshow_data)
+    slides = slideshow_data.get('slides', [])
+    terms = defaultdict(lambda: defaultdict(int))
+
+    def add(slide_number, fields, source):
+        for field, weight in fields.items():
+            for token in tokenize(field_text(source.get(field))):
+                terms[token][slide_number] += weight
+
+    add(0, DECK_FIELDS, metadata)
+    for number, slide in enumerate(slides, 1):
+        add(number, SLIDE_FIELDS, slide)
+
+    titles = [metadata.get('title', '')] + [slide.get('title', '') for slide in slides]
+    return {
+        'titles': [html.unescape(TAG_PATTERN.sub('', title)) for title in titles],
+        'terms': {term: dict(scores) for term, scores in terms.items()},
+    }
+
+
+def inline_data(html_path):
+    """The JSON text of the slideshowData object embedded in a hand-built deck page, or None."""
+    try:
+        page = Path(html_path).read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+    match = INLINE_DATA_PATTERN.search(page)
+    if not match:
+        return None
+    try:
+        _, end = json.JSONDecoder().raw_decode(page, match.end())
+    except ValueError:
+        # A JavaScript literal that isn't plain JSON; skip rather than guess
+        return None
+    return page[match.end():end]
+
+
+def deck_data(deck_path):
+    """A deck's data as JSON bytes, from slideshow_data.json or its page's inline object, or None."""
+    json_path = Path(deck_path) / 'slideshow_data.json'
+    if json_path.exists():
+        return json_path.read_bytes()
+    data = inline_data(Path(deck_path) / 'index.html')
+    return data.encode('utf-8') if data is not None else None
+
+
+def find_search_decks(base_path=BASE_PATH):
+    """Deck directories with data to index, including hand-built decks with inline data."""
+    return [deck for deck in sorted(Path(base_path).iterdir())
+            if deck.is_dir() and not deck.name.startswith(('_', '.')) and deck_data(deck) is not None]
+
+
+def deck_postings(deck_path, cache_dir=CACHE_DIR):
+    """A deck's index entry, reusing the cached one if its data hasn't changed. Returns (entry, reused)."""
+    data = deck_data(deck_path)
+    if data is None:
+        raise FileNotFoundError(f"No slideshow data in {deck_path}")
+    digest = hashlib.sha256(data + f':{INDEX_VERSION}'.encode()).hexdigest()
+    cache_path = Path(cache_dir) / f"{Path(deck_path).name}.json"
+    if cache_path.exists():
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('digest') == digest:
+            return cached, True
+
+    entry = {'digest': digest, **index_deck(json.loads(data))}
+    with atomic_write(cache_path) as f:
+        json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+    return entry, False
+
+
+def update_search_index(decks, search_dir=SEARCH_DIR, cache_dir=CACHE_DIR):
+    """
+    Rewrite the collection's search index for decks.
+
+    Returns stats: decks, reindexed (decks whose data changed), terms, shards.
+    """
+    decks = sorted(decks, key=lambda deck: Path(deck).name)
+    deck_list = []
+    shards = defaultdict(dict)
+    reindexed = 0
+    for deck_number, deck_path in enumerate(decks):
+        entry, reused = deck_postings(deck_path, cache_dir)
+        reindexed += not reused
+        # Only the template's player opens at a #slide-N link; hand-built decks are linked as a whole
+        deck_list.append({'name': Path(deck_path).name, 'titles': entry['titles'],
+                          'slideLinks': (Path(deck_path) / 'slideshow_data.json').exists()})
+        for term, scores in entry['terms'].items():
+            postings = shards[term[:PREFIX_LENGTH]].setdefault(term, [])
+            for slide, score in sorted(scores.items(), key=lambda item: int(item[0])):
+                postings += [deck_number, int(slide), score]
+
+    # Forget decks that no longer exist
+    names = {deck['name'] for deck in deck_list}
+    for cache_path in Path(cache_dir).glob('*.json'):
+        if cache_path.stem not in names:
+            cache_path.unlink()
+
+    shard_files = {}
+    for prefix, terms in sorted(shards.items()):
+        data = json.dumps(dict(sorted(terms.items())), ensure_ascii=False, separators=(',', ':'))
+        shard_files[prefix] = write_hashed(search_dir, 'terms', 'json', data.encode('utf-8')).name
+    remove_stale(search_dir, 'terms.*.json*', shard_files.values())
+
+    index = {
+        'version': INDEX_VERSION,
+        'prefixLength': PREFIX_LENGTH,
+        'minTokenLength': MIN_TOKEN_LENGTH,
+        'tokenPattern': BROWSER_TOKEN_PATTERN,
+        'stopwords': sorted(STOPWORDS),
+        'decks': deck_list,
+        'shards': shard_files,
+    }
+    index_bytes = json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with atomic_write(Path(search_dir) / 'index.json', binary=True, if_changed=True) as f:
+        f.write(index_bytes)
+
+    return {
+        'decks': len(deck_list),
+        'reindexed': reindexed,
+        'terms': sum(len(terms) for terms in shards.values()),
+        'shards': len(shard_files),
+    }
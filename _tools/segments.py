@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Split narration scripts into sentence-sized segments for synthesis.
+
+Each segment is synthesized and cached on its own, then the segments'
+MP3 frames are spliced back into the slide's file (see mp3.splice). A
+one-sentence edit therefore re-synthesizes one sentence, and a slide's
+latency is that of its longest sentence rather than the whole script.
+"""
+
+import re
+
+from tts_client import MAX_INPUT_CHARS
+
+# Sentence end, optional closing quote/bracket, whitespace, then a likely sentence start
+SENTENCE_BREAK = re.compile(r'(?<=[.!?…])["\'”’)\]]*\s+(?=["\'“‘(\[]?[A-Z0-9])')
+
+# Sentences shorter than this are joined to the next one, so "Yes." isn't its own request
+MIN_SEGMENT_CHARS = 40
+
+
+def split_sentences(text):
+    """Split text at sentence boundaries, keeping punctuation with each sentence."""
+    text = ' '.join((text or '').split())
+    if not text:
+        return []
+    sentences = []
+    start = 0
+    for match in SENTENCE_BREAK.finditer(text):
+        sentences.append(text[start:match.start()] + match.group().strip())
+        start = match.end()
+    sentences.append(text[start:])
+    return [s for s in sentences if s]
+
+
+def _split_long(sentence, max_chars):
+    """Break a sentence that exceeds max_chars at word boundaries."""
+    pieces = []
+    current = ''
+    for word in sentence.split(' '):
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        candidate = f"{current} {word}" if current else word
+        if len(candidate) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def segment_script(text, max_chars=MAX_INPUT_CHARS, min_chars=MIN_SEGMENT_CHARS):
+    """Return the script as a list of segment texts, each at most max_chars long."""
+    segments = []
+    pending = ''
+    for sentence in split_sentences(text):
+        for piece in _split_long(sentence, max_chars):
+            candidate = f"{pending} {piece}" if pending else piece
+            if len(candidate) > max_chars:
+                segments.append(pending)
+                candidate = piece
+            if len(candidate) < min_chars:
+                pending = candidate
+            else:
+                segments.append(candidate)
+                pending = ''
+    if pending:
+        if segments and len(segments[-1]) + 1 + len(pending) <= max_chars:
+            segments[-1] = f"{segments[-1]} {pending}"
+        else:
+            segments.append(pending)
+    return segments
+
+
+def needs_segmenting(text, max_chars=MAX_INPUT_CHARS):
+    """True when a script is too long to send in one request."""
+    return len(' '.join((text or '').split())) > max_chars
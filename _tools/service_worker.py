@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Per-deck service worker for instant repeat visits and offline playback.
+
+write_service_worker() renders _templates/service_worker.js into the
+deck's sw.js with a precache list of:
+- the deck page and, in split-asset mode, its data, CSS and JS files
+- every narration file recorded in slideshow_audio/manifest.json (clips,
+  their compact variants and the sprite)
+Each entry carries a revision (a prefix of its SHA-256), and the worker
+stores files under their revision, so after a rebuild browsers fetch only
+the files whose content changed. The page files are cached when the
+worker installs; narration is cached as it is first played, and the page
+asks the worker to fetch the rest of the deck's clips in the background.
+
+create_slideshow.py rewrites sw.js whenever it renders index.html, and
+generate_audio.py once it has published a new manifest.json.
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+
+from assets import content_hash, uses_split_assets
+from fileio import atomic_write
+from template_engine import load_template
+
+TEMPLATE_PATH = Path(__file__).parent.parent / '_templates' / 'service_worker.js'
+SW_FILENAME = 'sw.js'
+AUDIO_DIR = 'slideshow_audio'
+
+# Files a split-mode page shell links to or fetches
+ASSET_PATTERN = re.compile(r'''(?:href|src)="([^"]+)"|fetch\('([^']+)'\)''')
+
+REVISION_LENGTH = 12
+
+
+def file_revision(path):
+    return content_hash(Path(path).read_bytes(), REVISION_LENGTH)
+
+
+def page_entries(slideshow_path):
+    """The deck page and the local files its split-mode shell loads, as {url: revision}."""
+    slideshow_path = Path(slideshow_path)
+    html_path = slideshow_path / 'index.html'
+    if not html_path.exists():
+        return {}
+    entries = {'index.html': file_revision(html_path)}
+    if not uses_split_assets(slideshow_path):
+        return entries
+
+    for match in ASSET_PATTERN.finditer(html_path.read_text(encoding='utf-8')):
+        url = match.group(1) or match.group(2)
+        if ':' in url or url.startswith(('/', '#')):
+            continue
+        path = slideshow_path / url
+        if path.is_file():
+            entries[url] = file_revision(path)
+    return entries
+
+
+def audio_entries(slideshow_path):
+    """Every narration file in the deck's audio manifest, as {url: revision}."""
+    audio_dir = Path(slideshow_path) / AUDIO_DIR
+    manifest_path = audio_dir / 'manifest.json'
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    files = []
+    for entry in manifest.get('files', []):
+        files += entry.get('sources') or [entry]
+    if manifest.get('sprite'):
+        files.append(manifest['sprite'])
+
+    entries = {}
+    for entry in files:
+        if entry.get('sha256') and (audio_dir / entry['filename']).is_file():
+            entries[f"{AUDIO_DIR}/{entry['filename']}"] = entry['sha256'][:REVISION_LENGTH]
+    return entries
+
+
+def precache_manifest(slideshow_path):
+    """The worker's precache list: page files and narration, each with its revision."""
+    return {
+        'core': page_entries(slideshow_path),
+        'audio': audio_entries(slideshow_path),
+    }
+
+
+def write_service_worker(slideshow_path):
+    """Render the deck's sw.js from its current page and audio manifest. Returns its path."""
+    slideshow_path = Path(slideshow_path)
+    precache = precache_manifest(slideshow_path)
+    # Caches are shared by the whole origin, so each deck gets its own
+    deck_name = os.path.basename(os.path.abspath(slideshow_path))
+    context = {
+        'CACHE_NAME': json.dumps(f"slides:{deck_name}"),
+        'PRECACHE': json.dumps(precache, indent=4, sort_keys=True),
+    }
+    output_path = slideshow_path / SW_FILENAME
+    with atomic_write(output_path, if_changed=True) as f:
+        load_template(TEMPLATE_PATH).render_to(f, context)
+    return output_path
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Build-time slide markup for the slideshow template.
+
+Rather than have the player build every slide with innerHTML once the
+whole deck's data is parsed, generate_html() renders the slides here into
+the page's {{SLIDES_HTML}} placeholder, so the first slide is painted as
+soon as the HTML arrives and the player script only attaches behavior.
+
+All deck text is escaped: slide fields are plain text, not HTML.
+"""
+
+from html import escape
+
+INDENT = ' ' * 8
+
+
+def text(value):
+    return escape(str(value), quote=False)
+
+
+def render_visual(visual):
+    """Placeholder for a slide's visual; could be extended to charts, diagrams, etc."""
+    kind = visual.get('type', '') if isinstance(visual, dict) else visual
+    return ('<div style="padding: 40px; background: #f0f0f0; border-radius: 8px; color: #666;">'
+            f'[Visual: {text(kind)}]</div>')
+
+
+def render_title_slide(metadata):
+    lines = [
+        '<div class="slide title-slide active">',
+        f"    <h1>{text(metadata.get('title', ''))}</h1>",
+        f"    <div class=\"subtitle\">{text(metadata.get('subtitle') or '')}</div>",
+    ]
+    if metadata.get('author'):
+        lines.append(f'    <p style="margin-top: 40px; color: #7f8c8d;">By {text(metadata["author"])}</p>')
+    lines.append('</div>')
+    return lines
+
+
+def render_slide(slide):
+    slide_type = slide.get('type')
+    lines = [f'<div class="slide {escape(slide_type + "-slide") if slide_type else ""}">',
+             f"    <h1>{text(slide.get('title', ''))}</h1>"]
+    if slide.get('subtitle'):
+        lines.append(f"    <div class=\"subtitle\">{text(slide['subtitle'])}</div>")
+    if slide.get('content'):
+        lines.append('    <ul>')
+        lines += [f"        <li>{text(item)}</li>" for item in slide['content']]
+        lines.append('    </ul>')
+    if slide.get('example'):
+        lines.append(f"    <div class=\"example\">{text(slide['example'])}</div>")
+    if slide.get('visual'):
+        lines.append(f"    <div class=\"visual-container\">{render_visual(slide['visual'])}</div>")
+    lines.append('</div>')
+    return lines
+
+
+def indented(lines):
+    return '\n' + '\n'.join(INDENT + line for line in lines)
+
+
+def render_slides(slideshow_data):
+    """Yield the HTML of the title slide and every content slide, one chunk per slide."""
+    yield indented(render_title_slide(slideshow_data.get('metadata', {})))
+    for slide in slideshow_data.get('slides', []):
+        yield indented(render_slide(slide))
+    # Close the container at its own indentation
+    yield '\n' + INDENT[:-4]
+
+
+def slide_count(slideshow_data):
+    """Slides in the player, including the title slide."""
+    return len(slideshow_data.get('slides', [])) + 1
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Minimal compiled template renderer for slideshow HTML.
+
+A template is parsed once into a list of literal chunks and {{NAME}}
+placeholders, and cached by path and modification time. Rendering streams
+the chunks straight to an open file, so a deck's HTML is never assembled
+as one big string, and placeholder values can themselves be iterables of
+chunks (see json_for_script()).
+"""
+
+import re
+import json
+import threading
+from pathlib import Path
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([A-Z][A-Z0-9_]*)\s*\}\}')
+
+
+class Template:
+    """A template compiled into alternating literal and placeholder parts."""
+
+    def __init__(self, source):
+        self.parts = []
+        position = 0
+        for match in PLACEHOLDER_PATTERN.finditer(source):
+            if match.start() > position:
+                self.parts.append((False, source[position:match.start()]))
+            self.parts.append((True, match.group(1)))
+            position = match.end()
+        if position < len(source):
+            self.parts.append((False, source[position:]))
+
+    @property
+    def placeholders(self):
+        return {value for is_placeholder, value in self.parts if is_placeholder}
+
+    def render_chunks(self, context):
+        """Yield output chunks for context. Missing placeholders raise KeyError."""
+        for is_placeholder, value in self.parts:
+            if not is_placeholder:
+                yield value
+                continue
+            replacement = context[value]
+            if isinstance(replacement, str):
+                yield replacement
+            else:
+                yield from replacement
+
+    def render_to(self, f, context):
+        """Stream the rendered template into an open text file."""
+        for chunk in self.render_chunks(context):
+            f.write(chunk)
+
+    def render(self, context):
+        return ''.join(self.render_chunks(context))
+
+
+_compiled = {}
+_compiled_lock = threading.Lock()
+
+
+def load_template(path):
+    """Return the compiled template for path, re-parsing only if the file changed."""
+    path = Path(path)
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _compiled_lock:
+        cached = _compiled.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        template = Template(f.read())
+    with _compiled_lock:
+        _compiled[path] = (stamp, template)
+    return template
+
+
+def json_for_script(data, indent=2):
+    """
+    Yield JSON chunks that are safe to embed inside a <script> element.
+
+    '</' and '<!--' can only occur inside JSON strings, which the encoder
+    emits as single chunks, so escaping per chunk is enough.
+    """
+    for chunk in json.JSONEncoder(indent=indent).iterencode(data):
+        if '<' in chunk:
+            chunk = chunk.replace('</', '<\\/').replace('<!--', '\\u003c!--')
+        yield chunk
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Map-reduce transform of input notes into slideshow JSON.
+
+Inputs that fit one prompt are sent whole to _prompts/transform_to_slides.md.
+Longer inputs are streamed in sections (split at headings and paragraph
+breaks, never loading the whole file), and each section's key points are
+extracted in parallel with _prompts/extract_points.md. The points are then
+reduced into the slideshow schema with the transform prompt, condensing
+them again first if they are still too long for one prompt.
+
+Every LLM result is cached in _cache/transform/ by the hash of its prompt
+and model, so re-running on unchanged input makes no requests at all, and
+editing one section of a long document only re-extracts that section.
+"""
+
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from fileio import atomic_write
+from instrumentation import count, span
+from template_engine import load_template
+
+PROMPTS_DIR = Path(__file__).parent.parent / '_prompts'
+TRANSFORM_PROMPT = PROMPTS_DIR / 'transform_to_slides.md'
+EXTRACT_PROMPT = PROMPTS_DIR / 'extract_points.md'
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / '_cache' / 'transform'
+
+# Characters of input per map call; roughly 3-4k tokens
+SECTION_CHARS = 12000
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s')
+FENCE_PATTERN = re.compile(r'^```(?:json)?\s*\n(.*?)\n```\s*$', re.DOTALL)
+
+
+class TransformCache:
+    """JSON results of LLM calls, keyed by the hash of prompt and model."""
+
+    def __init__(self, root=None):
+        root = root or os.environ.get('SLIDES_TRANSFORM_CACHE') or DEFAULT_CACHE_DIR
+        self.root = Path(root)
+
+    def path_for(self, key):
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        path = self.path_for(key)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, key, value):
+        with atomic_write(self.path_for(key)) as f:
+            json.dump(value, f, ensure_ascii=False)
+        return value
+
+
+def prompt_key(model, prompt):
+    """Cache key for sending prompt to model."""
+    payload = json.dumps([model, prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def iter_sections(lines, max_chars=SECTION_CHARS):
+    """
+    Group lines of text into sections of at most about max_chars.
+
+    Sections end at a heading or blank line once they are at least half
+    full, so related paragraphs stay together. A single paragraph longer
+    than max_chars is cut at a line boundary.
+    """
+    current = []
+    size = 0
+    for line in lines:
+        at_break = not line.strip() or HEADING_PATTERN.match(line)
+        if size >= max_chars or (at_break and size >= max_chars // 2):
+            section = ''.join(current).strip()
+            if section:
+                yield section
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    section = ''.join(current).strip()
+    if section:
+        yield section
+
+
+def parse_json_reply(text):
+    """Parse a JSON object from a reply, tolerating a surrounding code fence."""
+    text = text.strip()
+    match = FENCE_PATTERN.match(text)
+    if match:
+        text = match.group(1)
+    start, end = text.find('{'), text.rfind('}')
+    if start == -1 or end == -1:
+        raise ValueError("Reply did not contain a JSON object")
+    return json.loads(text[start:end + 1])
+
+
+def cached_completion(client, cache, prompt):
+    """Return the parsed JSON reply to prompt, from the cache when possible."""
+    key = prompt_key(client.name, prompt)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            count('llm_cached')
+            return cached, True
+    result = parse_json_reply(client.complete(prompt))
+    if cache is not None:
+        cache.put(key, result)
+    return result, False
+
+
+def extract_points(client, cache, section, number):
+    """Map step: the key points of one section."""
+    prompt = load_template(EXTRACT_PROMPT).render({
+        'SECTION_NUMBER': str(number),
+        'SECTION_CONTENT': section,
+    })
+    return cached_completion(client, cache, prompt)
+
+
+def format_points(number, points):
+    """Render one section's extracted points as compact notes."""
+    lines = [f"## Part {number}: {points.get('heading', '').strip()}"]
+    lines += [f"- {point}" for point in points.get('points', [])]
+    for label, key in (('Examples', 'examples'), ('Data', 'data')):
+        if points.get(key):
+            lines.append(f"{label}:")
+            lines += [f"- {item}" for item in points[key]]
+    return '\n'.join(lines)
+
+
+def normalize_slideshow(data):
+    """Fill in defaults the player relies on and number the slides."""
+    metadata = data.setdefault('metadata', {})
+    metadata.setdefault('title', 'Untitled Presentation')
+    metadata.setdefault('subtitle', '')
+    metadata.setdefault('author', '')
+    metadata['date'] = metadata.get('date') or datetime.now().strftime('%Y-%m-%d')
+    metadata.setdefault('category', 'Strategy')
+    metadata.setdefault('voice', 'shimmer')
+    metadata['hasAudio'] = False
+    # Generated content never gets to choose a command to run (see tts_backends.py)
+    metadata.pop('ttsCommand', None)
+    slides = data.get('slides')
+    if not isinstance(slides, list) or not slides:
+        raise ValueError("Transformed slideshow has no slides")
+    for i, slide in enumerate(slides):
+        slide['id'] = i + 1
+        slide.setdefault('type', 'content')
+        slide.setdefault('content', [])
+    return data
+
+
+class MapReduceTransform:
+    """Turns a stream of text lines into slideshow JSON with an LLM client."""
+
+    def __init__(self, client, cache=None, jobs=4, section_chars=SECTION_CHARS):
+        self.client = client
+        self.cache = cache
+        self.jobs = jobs
+        self.section_chars = section_chars
+        self.stats = {'sections': 0, 'requests': 0, 'cached': 0}
+
+    def _complete(self, prompt):
+        result, cached = cached_completion(self.client, self.cache, prompt)
+        self._count(cached)
+        return result
+
+    def _count(self, cached):
+        self.stats['cached' if cached else 'requests'] += 1
+
+    def _map(self, executor, sections):
+        """
+        Submit sections as they are read; return their points in order.
+
+        At most a few sections per worker are held in memory at a time.
+        """
+        window = max(1, self.jobs) * 2
+        pending = []
+        results = []
+
+        def collect():
+            points, cached = pending.pop(0).result()
+            self._count(cached)
+            results.append(points)
+
+        for number, section in enumerate(sections, 1):
+            if len(pending) >= window:
+                collect()
+            pending.append(executor.submit(extract_points, self.client, self.cache, section, number))
+        while pending:
+            collect()
+        return results
+
+    def run(self, lines):
+        sections = iter_sections(lines, self.section_chars)
+        first = next(sections, None)
+        if first is None:
+            raise ValueError("Input is empty")
+        second = next(sections, None)
+
+        if second is None:
+            # Short input: one call with the original prompt
+            self.stats['sections'] = 1
+            prompt = load_template(TRANSFORM_PROMPT).render({'INPUT_CONTENT': first})
+            with span('reduce', sections=1):
+                return normalize_slideshow(self._complete(prompt))
+
+        def all_sections():
+            yield first
+            yield second
+            for section in sections:
+                yield section
+
+        with ThreadPoolExecutor(max_workers=max(1, self.jobs)) as executor:
+            with span('map') as fields:
+                points = self._map(executor, all_sections())
+                fields['sections'] = len(points)
+            self.stats['sections'] = len(points)
+            notes = [format_points(i + 1, p) for i, p in enumerate(points)]
+
+            # Condense again until the notes fit in one reduce prompt
+            while sum(len(n) for n in notes) > self.section_chars and len(notes) > 1:
+                groups = list(iter_sections((note + '\n\n' for note in notes), self.section_chars))
+                if len(groups) >= len(notes):
+                    break
+                with span('map', condense=True, sections=len(groups)):
+                    points = self._map(executor, groups)
+                notes = [format_points(i + 1, p) for i, p in enumerate(points)]
+
+        prompt = load_template(TRANSFORM_PROMPT).render({'INPUT_CONTENT': '\n\n'.join(notes)})
+        with span('reduce', sections=len(notes)):
+            return normalize_slideshow(self._complete(prompt))
+
+
+def transform_lines(lines, client, cache=None, jobs=4):
+    """Transform an iterable of text lines into slideshow JSON. Returns (data, stats)."""
+    transform = MapReduceTransform(client, cache if cache is not None else TransformCache(), jobs)
+    data = transform.run(lines)
+    return data, transform.stats
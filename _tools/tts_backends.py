@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Interchangeable text-to-speech engines for narration.
+
+- openai: the remote speech API (tts_client.py), for final renders
+- local:  a command-line synthesizer, one subprocess per clip, so clips
+          are synthesized in parallel by the worker pool with no network
+          round-trips or API cost (e.g. espeak-ng piped into lame)
+- fake:   deterministic silent MP3 about as long as the text would take
+          to read, for tests, benchmarks and timing a draft
+
+A deck picks its engine with metadata.ttsBackend; generate_audio.py
+--backend overrides it. The local backend's command comes only from
+--tts-command or SLIDES_TTS_COMMAND, never from a deck: deck data may be
+LLM-generated or pulled from someone else, and the command runs in a
+shell. Each backend has a `model` string that goes into the audio cache
+key, so draft and final narration of the same text are cached side by
+side and never mixed.
+
+Backends implement synthesize_to(path, text, voice, audio_format) ->
+(size, sha256) for each of their `formats`, and raise tts_client.TTSError
+on failure.
+"""
+
+import os
+import shlex
+import hashlib
+import subprocess
+import threading
+from pathlib import Path
+
+from audio_cache import looks_like_audio
+from fileio import atomic_write, file_digest, part_path
+from tts_client import AUDIO_FORMATS, DEFAULT_MODEL, TTSError, get_client
+
+DEFAULT_BACKEND = 'openai'
+
+# Command for the local backend; {input} is a UTF-8 text file, {output} the MP3 to write
+DEFAULT_LOCAL_COMMAND = 'espeak-ng -f {input} --stdout | lame --quiet - {output}'
+LOCAL_COMMAND_ENV = 'SLIDES_TTS_COMMAND'
+
+
+class BackendError(ValueError):
+    """A backend can't be used: unknown name, or no credentials."""
+
+
+class OpenAIBackend:
+    """The remote speech API, under the caller's rate limiter."""
+
+    name = 'openai'
+    rate_limited = True
+    formats = AUDIO_FORMATS
+
+    def __init__(self, model=DEFAULT_MODEL):
+        self.model = model
+        # Load credentials now, so a missing key is reported before any work starts
+        get_client()
+
+    @property
+    def client(self):
+        return get_client()
+
+    def synthesize_to(self, path, text, voice, audio_format='mp3'):
+        return self.client.synthesize_to(path, text, voice, self.model, audio_format)
+
+    def summary(self):
+        return self.client.summary()
+
+
+class LocalBackend:
+    """
+    A shell command that turns a text file into an MP3.
+
+    The command is a template with {input}, {output} and {voice}
+    placeholders, which are shell-quoted when substituted.
+    """
+
+    name = 'local'
+    rate_limited = False
+    formats = ('mp3',)
+
+    def __init__(self, command=None, timeout=300):
+        self.command = command or os.environ.get(LOCAL_COMMAND_ENV) or DEFAULT_LOCAL_COMMAND
+        self.timeout = timeout
+        program = shlex.split(self.command)[0] if self.command.strip() else 'none'
+        digest = hashlib.sha256(self.command.encode('utf-8')).hexdigest()[:12]
+        self.model = f"local:{os.path.basename(program)}:{digest}"
+        self._lock = threading.Lock()
+        self.stats = {'clips': 0}
+
+    def synthesize_to(self, path, text, voice, audio_format='mp3'):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text_path = part_path(path.with_suffix('.txt'))
+        output_path = part_path(path)
+        try:
+            text_path.write_text(text, encoding='utf-8')
+            command = self.command.format(input=shlex.quote(str(text_path)),
+                                          output=shlex.quote(str(output_path)),
+                                          voice=shlex.quote(voice))
+            try:
+                result = subprocess.run(command, shell=True, capture_output=True, timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                raise TTSError(f"Local synthesizer timed out after {self.timeout}s")
+            if result.returncode != 0:
+                error = result.stderr.decode('utf-8', 'replace').strip().splitlines()
+                raise TTSError(f"Local synthesizer exited with {result.returncode}: "
+                               f"{error[-1] if error else self.command}")
+            if not output_path.exists() or not looks_like_audio(output_path):
+                raise TTSError("Local synthesizer did not write an MP3 file")
+            os.replace(output_path, path)
+        finally:
+            text_path.unlink(missing_ok=True)
+            output_path.unlink(missing_ok=True)
+        with self._lock:
+            self.stats['clips'] += 1
+        return path.stat().st_size, file_digest(path)
+
+    def summary(self):
+        return f"{self.stats['clips']} clips synthesized locally with: {self.command}"
+
+
+class FakeBackend:
+    """Silent MP3 sized like speech; the same text always gives the same bytes."""
+
+    name = 'fake'
+    model = 'fake'
+    rate_limited = False
+    formats = ('mp3',)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {'clips': 0, 'bytes': 0}
+
+    def synthesize_to(self, path, text, voice, audio_format='mp3'):
+        from mock_server import speech_audio
+
+        audio = speech_audio(text)
+        with atomic_write(path, binary=True) as f:
+            f.write(audio)
+        with self._lock:
+            self.stats['clips'] += 1
+            self.stats['bytes'] += len(audio)
+        return len(audio), hashlib.sha256(audio).hexdigest()
+
+    def summary(self):
+        return f"{self.stats['clips']} silent clips, {self.stats['bytes'] / 1024:.0f} KB"
+
+
+BACKENDS = {
+    'openai': OpenAIBackend,
+    'local': LocalBackend,
+    'fake': FakeBackend,
+}
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_backend(name=None, command=None):
+    """
+    Return the process-wide backend called name (default: openai).
+
+    command (from --tts-command) configures the local backend. Raises BackendError for an
+    unknown name, or for openai when no API key is available.
+    """
+    name = name or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise BackendError(f"Unknown TTS backend '{name}' (choose from {', '.join(BACKENDS)})")
+    key = (name, command if name == 'local' else None)
+    with _instances_lock:
+        if key not in _instances:
+            try:
+                _instances[key] = LocalBackend(command) if name == 'local' else BACKENDS[name]()
+            except ValueError as e:
+                raise BackendError(f"{e}. Set OPENAI_API_KEY, or narrate a draft with "
+                                   f"--backend local or --backend fake") from e
+        return _instances[key]
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Reusable client for the OpenAI text-to-speech endpoint.
+
+Credentials are read once per process, and each worker thread keeps a
+persistent keep-alive connection to the speech endpoint (see
+http_pool.py), so only the first request on a thread pays for the TCP and
+TLS handshake. The client keeps
+simple counters (requests, latency, connect time, bytes) so per-request
+overhead can be measured.
+
+Responses can be streamed straight to disk in fixed-size chunks with
+synthesize_to(), so memory use does not grow with clip length.
+
+The endpoint can be overridden with the SLIDES_TTS_ENDPOINT environment
+variable, the key with OPENAI_API_KEY and the key file's location with
+SLIDES_OPENAI_KEY_FILE, so the tools can run against a
+local stand-in such as _tools/mock_server.py.
+
+Shared by _tools/generate_audio.py and the root generate_slideshow_audio.py.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+
+from fileio import CHUNK_SIZE, atomic_write
+from http_pool import KeepAliveClient
+
+API_KEY_FILE = os.environ.get('SLIDES_OPENAI_KEY_FILE') or '/Users/cam/keys/openai-key.js'
+SPEECH_ENDPOINT = 'https://api.openai.com/v1/audio/speech'
+DEFAULT_MODEL = 'tts-1'
+
+# Point the client at another server (e.g. _tools/mock_server.py)
+ENDPOINT_ENV = 'SLIDES_TTS_ENDPOINT'
+
+# Longest input the speech endpoint accepts, in characters
+MAX_INPUT_CHARS = 4096
+
+# Formats the speech endpoint can return (response_format), by file extension
+AUDIO_FORMATS = ('mp3', 'opus', 'aac', 'flac')
+
+# Status codes worth retrying after a pause
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TTSError(Exception):
+    """Error returned by the TTS API."""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status in RETRYABLE_STATUSES
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def get_api_key(key_file_path=API_KEY_FILE):
+    """Get API key from OPENAI_API_KEY, or else the absolute path."""
+    if os.environ.get('OPENAI_API_KEY'):
+        return os.environ['OPENAI_API_KEY']
+    try:
+        with open(key_file_path, 'r') as f:
+            content = f.read()
+
+        # Extract the API key from the JS export
+        match = re.search(r'OPENAI_API_KEY\s*=\s*["\'](.*?)["\']', content)
+        if match:
+            return match.group(1).strip()
+        else:
+            raise ValueError("Could not find OPENAI_API_KEY in key file")
+    except FileNotFoundError:
+        raise ValueError(f"Key file not found at {key_file_path}")
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"Error reading key file: {e}")
+
+
+class TTSClient(KeepAliveClient):
+    """Speech client holding one keep-alive connection per thread."""
+
+    def __init__(self, api_key=None, endpoint=SPEECH_ENDPOINT, model=DEFAULT_MODEL, timeout=120):
+        super().__init__(endpoint, timeout)
+        self.api_key = api_key or get_api_key()
+        self.model = model
+        self.stats.update({
+            'requests': 0,
+            'request_seconds': 0.0,
+            'bytes': 0,
+        })
+        self.latencies = []
+
+    def _open(self, text, voice, model, response_format='mp3'):
+        """Send a speech request and return the response once it is known to be 200."""
+        request = {
+            'model': model or self.model,
+            'input': text,
+            'voice': voice
+        }
+        if response_format != 'mp3':
+            request['response_format'] = response_format
+        body = json.dumps(request).encode('utf-8')
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'Connection': 'keep-alive'
+        }
+
+        start = time.perf_counter()
+        response = self._post(body, headers)
+        if response.status != 200:
+            data = response.read()
+            self._finish(response, start, len(data))
+            raise TTSError(
+                f"API error {response.status}: {data.decode('utf-8', 'replace')}",
+                status=response.status,
+                retry_after=parse_retry_after(response.getheader('Retry-After'))
+            )
+        return response, start
+
+    def _finish(self, response, start, size):
+        elapsed = time.perf_counter() - start
+        if response.will_close:
+            self._drop_connection()
+        with self._lock:
+            self.stats['requests'] += 1
+            self.stats['request_seconds'] += elapsed
+            self.stats['bytes'] += size
+            self.latencies.append(elapsed)
+
+    def synthesize_to(self, path, text, voice='shimmer', model=None, response_format='mp3'):
+        """
+        Stream audio for text into path, encoded as response_format (see AUDIO_FORMATS).
+
+        The file only appears once the whole response has arrived and matches
+        its Content-Length. Returns (size, sha256 hex digest).
+        """
+        response, start = self._open(text, voice, model, response_format)
+        expected = response.getheader('Content-Length')
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with atomic_write(path, binary=True) as f:
+                for chunk in iter(lambda: response.read(CHUNK_SIZE), b''):
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+                if expected is not None and int(expected) != size:
+                    raise TTSError(f"Truncated response: got {size} of {expected} bytes")
+                if size == 0:
+                    raise TTSError("Empty audio response")
+        except Exception:
+            self._drop_connection()
+            raise
+        self._finish(response, start, size)
+        return size, digest.hexdigest()
+
+    def summary(self):
+        """One-line description of request overhead so far."""
+        stats = self.stats
+        if not stats['requests']:
+            return "No TTS requests made"
+        avg_ms = stats['request_seconds'] / stats['requests'] * 1000
+        connect_ms = stats['connect_seconds'] / max(1, stats['connections']) * 1000
+        return (f"{stats['requests']} requests over {stats['connections']} connections, "
+                f"avg {avg_ms:.0f} ms/request, {connect_ms:.0f} ms/handshake, "
+                f"{stats['bytes'] / 1024:.0f} KB received")
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client():
+    """Return the process-wide client, loading credentials on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = TTSClient(endpoint=os.environ.get(ENDPOINT_ENV) or SPEECH_ENDPOINT)
+        return _default_client
+
+
+def configure(**kwargs):
+    """Replace the process-wide client, e.g. to use another endpoint."""
+    global _default_client
+    with _default_lock:
+        if _default_client is not None:
+            _default_client.close()
+        _default_client = TTSClient(**kwargs)
+        return _default_client
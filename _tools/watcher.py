@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Cheap file change detection for the preview server's watch mode.
+
+Both watchers take a callable returning the files of interest (re-evaluated
+on every poll, so new decks are picked up) and report which of them
+changed. On Linux, inotify is used through ctypes, so changes are seen as
+soon as the editor saves; elsewhere the files' mtimes are polled.
+"""
+
+import os
+import sys
+import time
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+EVENT_HEADER = struct.Struct('iIII')
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+
+# Editors often save in several steps; group events arriving this close together
+DEBOUNCE_SECONDS = 0.05
+
+
+def _stat_key(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class PollingWatcher:
+    """Detect changes by comparing file mtimes and sizes."""
+
+    def __init__(self, targets, interval=0.25):
+        self.targets = targets
+        self.interval = interval
+        self._seen = {path: _stat_key(path) for path in self._resolve()}
+
+    def _resolve(self):
+        return {Path(path).resolve() for path in self.targets()}
+
+    def poll(self, timeout=None):
+        """Block until something changes (or timeout) and return the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            current = {}
+            for path in self._resolve():
+                current[path] = _stat_key(path)
+                if path in self._seen and current[path] != self._seen[path]:
+                    changed.add(path)
+                elif path not in self._seen and current[path] is not None:
+                    changed.add(path)
+            self._seen = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detect changes with Linux inotify watches on the targets' directories."""
+
+    def __init__(self, targets):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc = libc
+        self.targets = targets
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._watches = {}
+        self._known = self._refresh()
+
+    def _refresh(self):
+        paths = {Path(path).resolve() for path in self.targets()}
+        for directory in {path.parent for path in paths}:
+            if directory in self._watches.values() or not directory.exists():
+                continue
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+        return paths
+
+    def _read_events(self):
+        changed = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                elif wd in self._watches and name:
+                    changed.add(self._watches[wd] / os.fsdecode(name))
+        return changed, overflow
+
+    def poll(self, timeout=None):
+        """Block until a target changes (or timeout) and return the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            paths = self._refresh()
+            # Files that appeared since the last poll count as changed
+            created = paths - self._known
+            self._known = paths
+            if created:
+                return created
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            # Wake up periodically to pick up newly created deck directories
+            wait = 1.0 if remaining is None else min(1.0, remaining)
+            ready, _, _ = select.select([self._fd], [], [], wait)
+            if ready:
+                time.sleep(DEBOUNCE_SECONDS)
+                events, overflow = self._read_events()
+                changed = paths if overflow else {path for path in events if path in paths}
+                if changed:
+                    return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_watcher(targets):
+    """Return an inotify watcher where available, else an mtime poller."""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(targets)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(targets)
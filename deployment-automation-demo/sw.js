@@ -0,0 +1,140 @@
+// Service worker for one slideshow, generated by _tools/service_worker.py.
+// Do not edit: it is rewritten whenever the deck is rendered or its audio changes.
+//
+// The page and its assets are precached on install. Narration is cached as
+// the player asks for it (the page also asks for every clip it will use in
+// the background), so once a deck has been opened it loads and plays
+// offline. Every file is cached under its content revision, so a new build
+// only re-fetches the files that changed.
+
+const CACHE_NAME = "slides:deployment-automation-demo";
+const PRECACHE = {
+    "audio": {},
+    "core": {
+        "index.html": "6240cca7482a"
+    }
+};
+
+const scope = self.registration.scope;
+const revisions = new Map();
+for (const [url, revision] of Object.entries(PRECACHE.core)) {
+    revisions.set(new URL(url, scope).href, revision);
+}
+for (const [url, revision] of Object.entries(PRECACHE.audio)) {
+    revisions.set(new URL(url, scope).href, revision);
+}
+
+function cacheKey(href) {
+    return `${href}?__rev=${revisions.get(href)}`;
+}
+
+function pageHref(request) {
+    // The deck page is requested as the directory or as index.html
+    const url = new URL(request.url);
+    url.search = '';
+    url.hash = '';
+    if (url.href === scope) {
+        url.pathname += 'index.html';
+    }
+    return url.href;
+}
+
+async function store(cache, href) {
+    const key = cacheKey(href);
+    if (await cache.match(key)) return;
+    const response = await fetch(href, { cache: 'reload' });
+    if (response.status !== 200) {
+        throw new Error(`${href}: HTTP ${response.status}`);
+    }
+    await cache.put(key, response);
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        await Promise.all(Object.keys(PRECACHE.core).map(url => store(cache, new URL(url, scope).href)));
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        // Drop every file whose revision is no longer current
+        const current = new Set([...revisions.keys()].map(cacheKey));
+        const cache = await caches.open(CACHE_NAME);
+        for (const request of await cache.keys()) {
+            if (!current.has(request.url)) {
+                await cache.delete(request);
+            }
+        }
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('message', event => {
+    if (!event.data || event.data.type !== 'precache') return;
+    event.waitUntil((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        for (const url of event.data.urls) {
+            const href = new URL(url, scope).href;
+            if (!revisions.has(href)) continue;
+            try {
+                await store(cache, href);
+            } catch (err) {
+                console.warn('Could not precache', href, err);
+            }
+        }
+    })());
+});
+
+// Answer a Range request (how audio elements load and seek) from a full cached body
+async function rangeResponse(request, response) {
+    const header = request.headers.get('Range');
+    const match = header && /^bytes=(\d*)-(\d*)$/.exec(header.trim());
+    if (!match || (!match[1] && !match[2])) return response;
+
+    const blob = await response.blob();
+    const size = blob.size;
+    let start;
+    let end;
+    if (!match[1]) {
+        start = Math.max(0, size - Number(match[2]));
+        end = size - 1;
+    } else {
+        start = Number(match[1]);
+        end = match[2] ? Math.min(Number(match[2]), size - 1) : size - 1;
+    }
+    if (start >= size || start > end) {
+        return new Response(null, { status: 416, headers: { 'Content-Range': `bytes */${size}` } });
+    }
+    return new Response(blob.slice(start, end + 1), {
+        status: 206,
+        headers: {
+            'Content-Type': response.headers.get('Content-Type') || 'application/octet-stream',
+            'Content-Range': `bytes ${start}-${end}/${size}`,
+            'Content-Length': String(end - start + 1),
+            'Accept-Ranges': 'bytes'
+        }
+    });
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const href = request.mode === 'navigate' ? pageHref(request) : request.url.split('#')[0];
+    if (!revisions.has(href)) return;
+
+    event.respondWith((async () => {
+        const cache = await caches.open(CACHE_NAME);
+        let response = await cache.match(cacheKey(href));
+        if (!response) {
+            try {
+                await store(cache, href);
+                response = await cache.match(cacheKey(href));
+            } catch (err) {
+                return fetch(request);
+            }
+        }
+        return rangeResponse(request, response);
+    })());
+});
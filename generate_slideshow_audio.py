@@ -8,12 +8,14 @@ Usage:
 """
 
 import os
-import json
 import re
+import sys
+import json
 import time
 from pathlib import Path
-import urllib.request
-import urllib.error
+
+sys.path.insert(0, str(Path(__file__).parent / '_tools'))
+from tts_client import API_KEY_FILE, get_api_key, get_client
 
 def extract_slideshow_scripts():
     """Extract all scripts from the slideshow HTML file."""
@@ -47,59 +49,6 @@ def extract_slideshow_scripts():
 
     return scripts
 
-def get_api_key():
-    """Get API key from the absolute path."""
-    key_file_path = '/Users/cam/keys/openai-key.js'
-    
-    try:
-        with open(key_file_path, 'r') as f:
-            content = f.read()
-        
-        # Extract the API key from the JS export
-        match = re.search(r'OPENAI_API_KEY\s*=\s*["\'](.*?)["\']', content)
-        if match:
-            return match.group(1).strip()
-        else:
-            raise ValueError("Could not find OPENAI_API_KEY in key file")
-    except FileNotFoundError:
-        raise ValueError(f"Key file not found at {key_file_path}")
-    except Exception as e:
-        raise ValueError(f"Error reading key file: {e}")
-
-def generate_audio(text, voice='shimmer'):
-    """Generate audio using OpenAI TTS API."""
-    api_key = get_api_key()
-
-    headers = {
-        'Authorization': f'Bearer {api_key}',
-        'Content-Type': 'application/json'
-    }
-
-    data = {
-        'model': 'tts-1',
-        'input': text,
-        'voice': voice
-    }
-
-    data_json = json.dumps(data).encode('utf-8')
-    
-    request = urllib.request.Request(
-        'https://api.openai.com/v1/audio/speech',
-        data=data_json,
-        headers=headers,
-        method='POST'
-    )
-    
-    try:
-        with urllib.request.urlopen(request) as response:
-            if response.status != 200:
-                error_data = response.read().decode('utf-8')
-                raise Exception(f"API error {response.status}: {error_data}")
-            return response.read()
-    except urllib.error.HTTPError as e:
-        error_data = e.read().decode('utf-8')
-        raise Exception(f"API error {e.code}: {error_data}")
-
 def main():
     """Main function to generate all audio files."""
     print("🎙️  Generating audio files for engineering slideshow...\n")
@@ -124,12 +73,8 @@ def main():
                 continue
 
             try:
-                # Generate audio
-                audio_data = generate_audio(script['text'])
-
-                # Save to file
-                with open(filename, 'wb') as f:
-                    f.write(audio_data)
+                # Stream audio straight to the file (renamed into place when complete)
+                get_client().synthesize_to(filename, script['text'], 'shimmer')
 
                 print(f"   ✓ Generated successfully")
 
@@ -141,6 +86,8 @@ def main():
                 print(f"   ❌ Error: {e}")
                 continue
 
+        print(f"\n📈 {get_client().summary()}")
+
         # Generate manifest file
         manifest = {
             'voice': 'shimmer',
@@ -175,7 +122,7 @@ if __name__ == '__main__':
         get_api_key()
     except ValueError as e:
         print(f"❌ Error: {e}")
-        print("\nExpected key file at: /Users/cam/keys/openai-key.js")
+        print(f"\nExpected key file at: {API_KEY_FILE}")
         print("The file should contain:")
         print('  export const OPENAI_API_KEY = "your-api-key-here";')
         exit(1)
@@ -1,35 +1,475 @@
 #!/usr/bin/env python3
 """
-Simple HTTP server to preview the engineering slideshow
+Local HTTP server to preview slideshows.
+
+Serves the whole collection (or any directory given with --root) from a
+threaded server, so the player's parallel audio preloads don't queue
+behind each other. Static files support byte ranges (seeking within
+narration), ETag/Last-Modified conditional requests (304 Not Modified)
+and are sent with zero-copy sendfile where the OS supports it.
+
+With --watch, edits to a deck's slideshow_data.json (or to the template)
+re-render only the affected decks' HTML, and open pages are told to
+reload over Server-Sent Events. Decks' offline service workers are
+replaced by one that unregisters itself, so edits are never served from
+a browser cache.
+
+With --narrate, a slide's narration is synthesized the first time the
+player asks for it (and the next few slides in the background) and served
+from the audio cache, so a deck can be heard before generate_audio.py has
+run (see _tools/on_demand_audio.py).
+
+Usage:
+    python preview_slideshow.py                       # collection index
+    python preview_slideshow.py engineering-organization
+    python preview_slideshow.py --port 9000 --root /path/to/slides --no-browser
+    python preview_slideshow.py my-deck --watch
+    python preview_slideshow.py my-deck --watch --narrate --backend fake
 """
 
-import http.server
-import socketserver
+import io
 import os
+import re
+import sys
+import time
+import argparse
+import threading
+import http.server
 import webbrowser
+from email.utils import formatdate, parsedate_to_datetime
 from pathlib import Path
+from urllib.parse import urlsplit
 
 PORT = 8888
 DIRECTORY = Path(__file__).parent
+TOOLS_DIRECTORY = DIRECTORY / '_tools'
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+AUDIO_PATTERN = re.compile(r'^(.*)/slideshow_audio/slide-(\d+)\.mp3$')
+
+LIVE_RELOAD_PATH = '/__livereload'
+LIVE_RELOAD_SCRIPT = """<script>
+(function () {
+    var source = new EventSource('%s');
+    source.addEventListener('reload', function (event) {
+        var page = location.pathname.replace(/index\\.html$/, '');
+        var deck = event.data ? '/' + event.data + '/' : '/';
+        if (page === deck) {
+            location.reload();
+        }
+    });
+})();
+</script>
+""" % LIVE_RELOAD_PATH
+
+# Tells the player to request narration even though the deck has none yet
+ON_DEMAND_SCRIPT = """<script>window.slidesOnDemandAudio = true;</script>
+"""
+
+# Served in place of each deck's sw.js when watching or narrating, so cached files never hide a rebuild
+PASSTHROUGH_WORKER = b"""// preview_slideshow.py: no offline cache while editing
+self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', event => event.waitUntil(self.registration.unregister()));
+"""
+
+
+class LiveReload:
+    """Broadcasts 'deck changed' events to every connected browser."""
+
+    def __init__(self, history=100):
+        self._condition = threading.Condition()
+        self._events = []
+        self._version = 0
+        self._history = history
+
+    @property
+    def version(self):
+        with self._condition:
+            return self._version
+
+    def publish(self, decks):
+        with self._condition:
+            for deck in decks:
+                self._version += 1
+                self._events.append((self._version, deck))
+            del self._events[:-self._history]
+            self._condition.notify_all()
+
+    def wait(self, since, timeout):
+        """Return (version, decks changed after since), waiting up to timeout."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._version > since, timeout)
+            return self._version, [deck for version, deck in self._events if version > since]
+
 
 class Handler(http.server.SimpleHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DIRECTORY, **kwargs)
-
-def main():
-    with socketserver.TCPServer(("", PORT), Handler) as httpd:
-        print(f"🚀 Server running at http://localhost:{PORT}")
-        print(f"📂 Serving files from: {DIRECTORY}")
-        print(f"🎯 Direct link to slideshow: http://localhost:{PORT}/engineering_slideshow.html")
+    protocol_version = 'HTTP/1.1'
+
+    extensions_map = {
+        **http.server.SimpleHTTPRequestHandler.extensions_map,
+        '.mp3': 'audio/mpeg',
+        '.opus': 'audio/ogg',
+        '.aac': 'audio/aac',
+        '.json': 'application/json',
+    }
+
+    # Set by serve() when watching or narrating
+    live_reload = None
+    narrator = None
+
+    def __init__(self, *args, directory=None, **kwargs):
+        self._range = None
+        super().__init__(*args, directory=directory or str(DIRECTORY), **kwargs)
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-cache')
+        super().end_headers()
+
+    def do_GET(self):
+        if self.live_reload and urlsplit(self.path).path == LIVE_RELOAD_PATH:
+            self.stream_reload_events()
+            return
+        if (self.live_reload or self.narrator) and urlsplit(self.path).path.endswith('/sw.js'):
+            self.send_passthrough_worker()
+            return
+        super().do_GET()
+
+    def stream_reload_events(self):
+        """Hold the connection open and push a 'reload' event per changed deck."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        version = self.live_reload.version
+        try:
+            self.wfile.write(b'retry: 500\n\n')
+            self.wfile.flush()
+            while True:
+                version, decks = self.live_reload.wait(version, timeout=15)
+                if decks:
+                    message = ''.join(f"event: reload\ndata: {deck}\n\n" for deck in decks)
+                else:
+                    message = ': ping\n\n'
+                self.wfile.write(message.encode('utf-8'))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def send_passthrough_worker(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/javascript')
+        self.send_header('Content-Length', str(len(PASSTHROUGH_WORKER)))
+        self.end_headers()
+        self.wfile.write(PASSTHROUGH_WORKER)
+
+    def narrate(self, path):
+        """
+        The file to serve for path: a requested slide-N.mp3 is answered with
+        the cached clip of the slide's current script. None after an error reply.
+        """
+        match = AUDIO_PATTERN.match(path)
+        if not match or not os.path.isfile(os.path.join(match.group(1), 'slideshow_data.json')):
+            return path
+        try:
+            return str(self.narrator.audio_for(match.group(1), int(match.group(2))))
+        except IndexError as e:
+            self.send_error(404, str(e))
+        except Exception as e:
+            print(f"❌ Could not narrate {os.path.basename(path)}: {e}")
+            self.send_error(503, f"Narration failed: {e}")
+        return None
+
+    def send_head(self):
+        # Per request: a HEAD never reaches copyfile, and keep-alive reuses this handler
+        self._range = None
+        path = self.translate_path(self.path)
+        if self.narrator:
+            path = self.narrate(path)
+            if path is None:
+                return None
+        if os.path.isdir(path):
+            index = os.path.join(path, 'index.html')
+            if not urlsplit(self.path).path.endswith('/') or not os.path.isfile(index):
+                return super().send_head()
+            path = index
+        if (self.live_reload or self.narrator) and path.endswith('.html'):
+            return self.send_injected_html(path)
+        if path.endswith('/'):
+            self.send_error(404, "File not found")
+            return None
+
+        try:
+            f = open(path, 'rb')
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        try:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+            last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+            if self._not_modified(etag, stat.st_mtime):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', last_modified)
+                self.end_headers()
+                f.close()
+                return None
+
+            byte_range = self._requested_range(size, etag, stat.st_mtime)
+            if byte_range == 'unsatisfiable':
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                f.close()
+                return None
+
+            if byte_range:
+                start, end = byte_range
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+                self._range = (start, end - start + 1)
+            else:
+                self.send_response(200)
+                self._range = (0, size)
+
+            self.send_header('Content-Type', self.guess_type(path))
+            self.send_header('Content-Length', str(self._range[1]))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('ETag', etag)
+            self.send_header('Last-Modified', last_modified)
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def send_injected_html(self, path):
+        """Serve an HTML page with the live-reload client and the on-demand flag added."""
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+
+        if self.live_reload:
+            script = LIVE_RELOAD_SCRIPT.encode('utf-8')
+            position = content.rfind(b'</body>')
+            if position == -1:
+                content += script
+            else:
+                content = content[:position] + script + content[position:]
+        if self.narrator:
+            # Before the player script runs
+            position = content.find(b'</head>')
+            content = content[:max(position, 0)] + ON_DEMAND_SCRIPT.encode('utf-8') + content[max(position, 0):]
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        return io.BytesIO(content)
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f'W/{etag}' in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(mtime) <= since
+        return False
+
+    def _requested_range(self, size, etag, mtime):
+        """Return (start, end) for a satisfiable single range, None or 'unsatisfiable'."""
+        header = self.headers.get('Range')
+        if not header:
+            return None
+
+        # A stale If-Range means the client's partial copy is outdated
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range != etag:
+            try:
+                if parsedate_to_datetime(if_range).timestamp() < int(mtime):
+                    return None
+            except (TypeError, ValueError):
+                return None
+
+        match = RANGE_PATTERN.match(header.strip())
+        if not match:
+            # Multiple ranges or other units: fall back to the full body
+            return None
+        first, last = match.groups()
+        if not first and not last:
+            return None
+        if not first:
+            length = min(int(last), size)
+            if length == 0:
+                return 'unsatisfiable'
+            return size - length, size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            return 'unsatisfiable'
+        return start, end
+
+    def copyfile(self, source, outputfile):
+        byte_range, self._range = self._range, None
+        try:
+            if byte_range is None:
+                # Bodies send_head didn't open from disk (listings, injected pages) go out whole
+                super().copyfile(source, outputfile)
+                return
+            offset, count = byte_range
+            if count:
+                self.connection.sendfile(source, offset, count)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def deck_url(port, root, deck=None):
+    """URL to open for a deck name, deck path or HTML file under root."""
+    if not deck:
+        cwd = Path.cwd().resolve()
+        root = Path(root).resolve()
+        if cwd != root and root in cwd.parents and (cwd / 'index.html').exists():
+            deck = str(cwd.relative_to(root))
+    if not deck:
+        return f"http://localhost:{port}/"
+
+    deck_path = Path(deck)
+    if deck_path.is_absolute():
+        deck_path = deck_path.resolve().relative_to(Path(root).resolve())
+    url_path = deck_path.as_posix().strip('/')
+    if not url_path.endswith('.html'):
+        url_path += '/'
+    return f"http://localhost:{port}/{url_path}"
+
+
+def watch_decks(root, live_reload):
+    """Re-render decks whose data (or the shared template) changed and notify browsers."""
+    sys.path.insert(0, str(TOOLS_DIRECTORY))
+    from build_all import TEMPLATE_PATH, find_decks, rebuild_decks, update_root_index
+    from search_index import find_search_decks, update_search_index
+    from watcher import create_watcher
+
+    template_path = TEMPLATE_PATH.resolve()
+
+    def targets():
+        return [template_path] + [deck / 'slideshow_data.json' for deck in find_decks(root)]
+
+    watcher = create_watcher(targets)
+    print(f"👀 Watching {len(targets()) - 1} slideshows for changes ({type(watcher).__name__})")
+
+    while True:
+        changed = watcher.poll()
+        start = time.perf_counter()
+        if template_path in changed:
+            decks = find_decks(root)
+        else:
+            decks = sorted({path.parent for path in changed if path.exists()})
+        if not decks:
+            continue
+
+        try:
+            rebuild_decks(decks)
+        except Exception as e:
+            print(f"❌ Rebuild failed: {e}")
+            continue
+        try:
+            update_root_index(find_decks(root), root / 'index.html')
+            update_search_index(find_search_decks(root), root / 'search')
+        except (OSError, ValueError):
+            pass
+
+        names = [Path(deck).resolve().relative_to(root).as_posix() for deck in decks]
+        live_reload.publish(names + [''])
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"🔄 Rebuilt {', '.join(names)} in {elapsed:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Preview slideshows locally')
+    parser.add_argument('deck', nargs='?', help='Deck directory or HTML file to open (default: collection index)')
+    parser.add_argument('--port', '-p', type=int, default=PORT, help=f'Port to listen on (default: {PORT})')
+    parser.add_argument('--root', '-r', default=str(DIRECTORY), help='Directory to serve (default: repository root)')
+    parser.add_argument('--no-browser', action='store_true', help="Don't open a browser window")
+    parser.add_argument('--watch', '-w', action='store_true',
+                        help='Rebuild edited decks and live-reload open pages')
+    parser.add_argument('--narrate', action='store_true',
+                        help='Synthesize each slide\'s narration when the player first asks for it')
+    parser.add_argument('--backend', default=None,
+                        help='TTS backend for --narrate: openai, local or fake '
+                             '(default: the deck\'s metadata.ttsBackend, else openai)')
+    parser.add_argument('--tts-command', default=None, metavar='COMMAND',
+                        help='Synthesizer command for the local backend (default: $SLIDES_TTS_COMMAND)')
+    parser.add_argument('--prefetch', type=int, default=2,
+                        help='Slides to narrate ahead of the one playing (default: 2)')
+    args = parser.parse_args(argv)
+    try:
+        serve(args.deck, port=args.port, root=args.root, open_browser=not args.no_browser, watch=args.watch,
+              narrate=args.narrate, backend=args.backend, prefetch=args.prefetch, tts_command=args.tts_command)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 1
+    return 0
+
+
+def serve(deck=None, port=PORT, root=DIRECTORY, open_browser=True, watch=False,
+          narrate=False, backend=None, prefetch=2, tts_command=None):
+    """
+    Serve root and open deck in a browser, until Ctrl+C.
+
+    With narrate, missing or stale slide audio is synthesized on request
+    with backend (see _tools/on_demand_audio.py).
+    """
+    root = Path(root).resolve()
+
+    if narrate:
+        if str(TOOLS_DIRECTORY) not in sys.path:
+            sys.path.insert(0, str(TOOLS_DIRECTORY))
+        from on_demand_audio import OnDemandNarrator
+        from tts_backends import get_backend
+
+        if backend:
+            # Report an unknown backend or missing key now rather than on the first slide
+            get_backend(backend, tts_command)
+        Handler.narrator = OnDemandNarrator(backend, prefetch=prefetch, tts_command=tts_command)
+        print(f"🎙️  Narrating slides on demand ({backend or 'deck default'} backend, {prefetch} ahead)")
+
+    if watch:
+        Handler.live_reload = LiveReload()
+        threading.Thread(target=watch_decks, args=(root, Handler.live_reload), daemon=True).start()
+
+    def handler(*handler_args, **handler_kwargs):
+        return Handler(*handler_args, directory=str(root), **handler_kwargs)
+
+    with http.server.ThreadingHTTPServer(("", port), handler) as httpd:
+        httpd.daemon_threads = True
+        url = deck_url(port, root, deck)
+        print(f"🚀 Server running at http://localhost:{port}")
+        print(f"📂 Serving files from: {root}")
+        print(f"🎯 Direct link to slideshow: {url}")
         print("\nPress Ctrl+C to stop the server\n")
-        
+
         # Automatically open the slideshow in default browser
-        webbrowser.open(f"http://localhost:{PORT}/engineering_slideshow.html")
-        
+        if open_browser:
+            webbrowser.open(url)
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\n✅ Server stopped")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
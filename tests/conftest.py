@@ -0,0 +1,9 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# The tools import each other as top-level modules (see _tools/__init__.py)
+for path in (ROOT / '_tools', ROOT):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,36 @@
+from audio_cache import AudioCache, cache_key, looks_like_audio, normalize_text, spliced_key
+from mp3 import silence
+
+
+def test_whitespace_edits_keep_the_key():
+    assert normalize_text('  Hello\n  world ') == 'Hello world'
+    assert cache_key('Hello  world', 'shimmer', 'tts-1') == cache_key('Hello world\n', 'shimmer', 'tts-1')
+
+
+def test_voice_model_and_text_change_the_key():
+    keys = {cache_key('Hello', 'shimmer', 'tts-1'), cache_key('Hello', 'nova', 'tts-1'),
+            cache_key('Hello', 'shimmer', 'tts-1-hd'), cache_key('Hello!', 'shimmer', 'tts-1')}
+    assert len(keys) == 4
+
+
+def test_spliced_key_depends_on_order():
+    assert spliced_key(['a', 'b']) != spliced_key(['b', 'a'])
+
+
+def test_put_get_and_materialize(tmp_path):
+    cache = AudioCache(tmp_path / 'cache')
+    key = cache_key('Hello', 'shimmer', 'tts-1')
+    assert cache.get(key) is None
+    blob = cache.put_bytes(key, silence(0.1))
+    assert blob == cache.get(key) and blob.parent.name == key[:2]
+    out = cache.materialize(key, tmp_path / 'deck' / 'slide-0.mp3')
+    assert out.read_bytes() == blob.read_bytes()
+    assert looks_like_audio(out)
+
+
+def test_remove_stale_parts_sweeps_every_shard(tmp_path):
+    cache = AudioCache(tmp_path)
+    for shard in ('ab', 'cd'):
+        (tmp_path / shard).mkdir()
+        (tmp_path / shard / '.x.mp3.999999999-1.part').touch()
+    assert len(cache.remove_stale_parts()) == 2
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from fileio import LockedError, PART_SUFFIX, atomic_write, exclusive_lock, remove_stale_parts
+
+
+def test_atomic_write_replaces_only_on_success(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_text('old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(path) as f:
+            f.write('new')
+            raise RuntimeError
+    assert path.read_text() == 'old'
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_if_changed_leaves_identical_content_alone(tmp_path):
+    path = tmp_path / 'out.bin'
+    path.write_bytes(b'same')
+    os.utime(path, ns=(0, 0))
+    with atomic_write(path, binary=True, if_changed=True) as f:
+        f.write(b'same')
+    assert path.stat().st_mtime_ns == 0
+    with atomic_write(path, binary=True, if_changed=True) as f:
+        f.write(b'different')
+    assert path.read_bytes() == b'different'
+
+
+def test_remove_stale_parts_keeps_live_writers(tmp_path):
+    dead = tmp_path / f'.a.mp3.999999999-1{PART_SUFFIX}'
+    live = tmp_path / f'.b.mp3.{os.getpid()}-1{PART_SUFFIX}'
+    dead.touch()
+    live.touch()
+    assert remove_stale_parts(tmp_path) == [dead]
+    assert live.exists()
+
+
+def test_lock_is_exclusive_and_released(tmp_path):
+    path = tmp_path / '.journal.lock'
+    with exclusive_lock(path):
+        assert path.read_text() == str(os.getpid())
+        with pytest.raises(LockedError, match=str(os.getpid())):
+            with exclusive_lock(path):
+                pass
+    assert not path.exists()
+    with exclusive_lock(path):
+        pass
+
+
+def test_lock_left_by_a_dead_process_is_taken(tmp_path):
+    path = tmp_path / '.journal.lock'
+    code = ('import os, sys; sys.path.insert(0, sys.argv[2]); from fileio import exclusive_lock\n'
+            'with exclusive_lock(sys.argv[1]): os._exit(0)')
+    tools = os.path.join(os.path.dirname(__file__), '..', '_tools')
+    subprocess.run([sys.executable, '-c', code, str(path), tools], check=True)
+    assert path.exists()
+    with exclusive_lock(path):
+        assert path.read_text() == str(os.getpid())
@@ -0,0 +1,17 @@
+import pytest
+
+from instrumentation import percentile
+
+
+def test_percentile_of_nothing_is_zero():
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.parametrize('p, expected', [(0, 1), (10, 1), (50, 5), (90, 9), (95, 10), (100, 10)])
+def test_percentile_uses_nearest_rank(p, expected):
+    assert percentile(list(range(10, 0, -1)), p) == expected
+
+
+def test_percentile_of_one_value():
+    assert percentile([7.5], 50) == 7.5
+    assert percentile([7.5], 99) == 7.5
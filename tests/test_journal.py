@@ -0,0 +1,63 @@
+from journal import DONE, FAILED, IN_FLIGHT, PENDING, JobJournal
+
+
+def scripts(*pairs):
+    return [{'id': slide_id, 'hash': digest} for slide_id, digest in pairs]
+
+
+def test_new_slides_start_pending(tmp_path):
+    journal = JobJournal(tmp_path)
+    assert journal.start(scripts(('slide-0', 'a'), ('slide-1', 'b'))) == []
+    assert journal.counts() == {PENDING: 2, IN_FLIGHT: 0, DONE: 0, FAILED: 0}
+
+
+def test_state_survives_a_restart(tmp_path):
+    journal = JobJournal(tmp_path)
+    journal.start(scripts(('slide-0', 'a'), ('slide-1', 'b')))
+    journal.mark(['slide-0'], IN_FLIGHT)
+    journal.mark(['slide-0'], DONE, bytes=10, sha256='x')
+    journal.mark(['slide-1'], IN_FLIGHT)
+
+    # A crash leaves slide-1 in flight; the next run puts it back to pending
+    resumed = JobJournal(tmp_path)
+    resumed.start(scripts(('slide-0', 'a'), ('slide-1', 'b')))
+    assert resumed.slides['slide-0']['state'] == DONE
+    assert resumed.slides['slide-1']['state'] == PENDING
+    assert resumed.completed() == [{'id': 'slide-0', 'hash': 'a', 'bytes': 10, 'sha256': 'x'}]
+
+
+def test_changed_script_starts_over(tmp_path):
+    journal = JobJournal(tmp_path)
+    journal.start(scripts(('slide-0', 'a')))
+    journal.mark(['slide-0'], DONE)
+    journal.start(scripts(('slide-0', 'changed')))
+    assert journal.slides['slide-0'] == {'hash': 'changed', 'state': PENDING, 'attempts': 0}
+
+
+def test_failures_are_exhausted_after_max_attempts(tmp_path):
+    journal = JobJournal(tmp_path, max_attempts=2)
+    journal.start(scripts(('slide-0', 'a')))
+    for _ in range(2):
+        journal.mark(['slide-0'], IN_FLIGHT)
+        journal.mark(['slide-0'], FAILED, reason='HTTP 500')
+    assert journal.failures() == {'slide-0': 'HTTP 500'}
+    assert journal.start(scripts(('slide-0', 'a'))) == ['slide-0']
+    assert journal.start(scripts(('slide-0', 'a')), retry_failed=True) == []
+    assert journal.slides['slide-0']['attempts'] == 0
+
+
+def test_marking_clears_an_old_reason(tmp_path):
+    journal = JobJournal(tmp_path)
+    journal.start(scripts(('slide-0', 'a')))
+    journal.mark(['slide-0'], FAILED, reason='timeout')
+    journal.mark(['slide-0'], IN_FLIGHT)
+    assert 'reason' not in journal.slides['slide-0']
+    assert journal.slides['slide-0']['attempts'] == 1
+
+
+def test_remove_deletes_the_file(tmp_path):
+    journal = JobJournal(tmp_path)
+    journal.start(scripts(('slide-0', 'a')))
+    assert journal.path.exists()
+    journal.remove()
+    assert not journal.path.exists()
@@ -0,0 +1,89 @@
+import pytest
+
+from mp3 import SILENT_FRAME_HEADER, audio_info, parse_header, scan_frames, silence, splice
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, stereo, no padding
+MPEG1_HEADER = bytes([0xFF, 0xFB, 0x90, 0x00])
+
+
+def test_parse_header_reads_mpeg1_layer3():
+    header = parse_header(MPEG1_HEADER)
+    assert (header.version, header.layer) == (1, 3)
+    assert header.bitrate == 128000
+    assert header.sample_rate == 44100
+    assert header.channels == 2
+    assert header.samples == 1152
+    assert header.frame_length == 417
+
+
+def test_parse_header_counts_padding():
+    assert parse_header(bytes([0xFF, 0xFB, 0x92, 0x00])).frame_length == 418
+
+
+def test_parse_header_reads_the_speech_endpoint_format():
+    header = parse_header(SILENT_FRAME_HEADER)
+    assert (header.version, header.layer) == (2, 3)
+    assert (header.bitrate, header.sample_rate, header.channels) == (160000, 24000, 1)
+    assert (header.frame_length, header.samples) == (480, 576)
+
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'ID3\x04',
+    bytes([0xFF, 0xFB, 0xF0, 0x00]),  # bitrate index 15
+    bytes([0xFF, 0xFB, 0x00, 0x00]),  # free format
+    bytes([0xFF, 0xFB, 0x9C, 0x00]),  # reserved sample rate
+    bytes([0xFF, 0xE9, 0x90, 0x00]),  # reserved layer
+])
+def test_parse_header_rejects_non_frames(data):
+    assert parse_header(data) is None
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return path
+
+
+def test_audio_info_measures_duration(tmp_path):
+    path = write(tmp_path / 'a.mp3', silence(2.0))
+    info = audio_info(path)
+    assert info['frames'] == round(2.0 * 24000 / 576)
+    assert info['duration'] == pytest.approx(2.0, abs=0.03)
+    assert info['bitrate'] == 160000
+
+
+def test_scan_skips_tags_and_garbage(tmp_path):
+    id3v2 = b'ID3\x03\x00\x00' + bytes([0, 0, 0, 5]) + b'xxxxx'
+    id3v1 = b'TAG' + bytes(125)
+    frames = silence(0.1)
+    path = write(tmp_path / 'a.mp3', id3v2 + frames[:480] + b'junk' + frames[480:] + id3v1)
+    assert len(list(scan_frames(path))) == len(frames) // 480
+
+
+def test_scan_skips_a_leading_xing_frame(tmp_path):
+    header = SILENT_FRAME_HEADER
+    xing = header + bytes(32) + b'Xing' + bytes(480 - 40)
+    path = write(tmp_path / 'a.mp3', xing + silence(0.1))
+    assert len(list(scan_frames(path))) == len(silence(0.1)) // 480
+
+
+def test_splice_concatenates_frames_with_segment_offsets(tmp_path):
+    first = write(tmp_path / 'a.mp3', silence(1.0))
+    second = write(tmp_path / 'b.mp3', silence(0.5))
+    out = tmp_path / 'out.mp3'
+    segments = splice([first, second], out)
+
+    assert out.read_bytes() == first.read_bytes() + second.read_bytes()
+    assert segments[0]['byteOffset'] == 0
+    assert segments[1]['byteOffset'] == first.stat().st_size
+    assert segments[1]['frameOffset'] == segments[0]['frames']
+    assert segments[1]['start'] == segments[0]['duration']
+    assert audio_info(out)['frames'] == segments[0]['frames'] + segments[1]['frames']
+
+
+def test_splice_rejects_mixed_formats(tmp_path):
+    speech = write(tmp_path / 'a.mp3', silence(0.1))
+    music = write(tmp_path / 'b.mp3', (MPEG1_HEADER + bytes(413)) * 3)
+    with pytest.raises(ValueError):
+        splice([speech, music], tmp_path / 'out.mp3')
+    assert not (tmp_path / 'out.mp3').exists()
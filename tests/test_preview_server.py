@@ -0,0 +1,95 @@
+import functools
+import http.client
+import http.server
+import threading
+
+import pytest
+
+from preview_slideshow import Handler
+
+BODY = bytes(range(256)) * 4
+
+
+@pytest.fixture(scope='module')
+def address(tmp_path_factory):
+    tmp_path = tmp_path_factory.mktemp('site')
+    (tmp_path / 'deck' / 'slideshow_audio').mkdir(parents=True)
+    (tmp_path / 'deck' / 'slideshow_audio' / 'slide-0.mp3').write_bytes(BODY)
+    (tmp_path / 'deck' / 'index.html').write_text('<html><body>deck</body></html>')
+    handler = functools.partial(Handler, directory=str(tmp_path))
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def server(address):
+    connection = http.client.HTTPConnection(*address, timeout=5)
+    yield connection
+    connection.close()
+
+
+def request(connection, method, path, **headers):
+    connection.request(method, path, headers=headers)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+AUDIO = '/deck/slideshow_audio/slide-0.mp3'
+
+
+def test_full_file(server):
+    response, body = request(server, 'GET', AUDIO)
+    assert response.status == 200
+    assert response.getheader('Accept-Ranges') == 'bytes'
+    assert body == BODY
+
+
+@pytest.mark.parametrize('header, start, end', [
+    ('bytes=0-9', 0, 9),
+    ('bytes=1000-', 1000, 1023),
+    ('bytes=-24', 1000, 1023),
+    ('bytes=1000-5000', 1000, 1023),
+])
+def test_satisfiable_ranges(server, header, start, end):
+    response, body = request(server, 'GET', AUDIO, Range=header)
+    assert response.status == 206
+    assert response.getheader('Content-Range') == f'bytes {start}-{end}/{len(BODY)}'
+    assert body == BODY[start:end + 1]
+
+
+@pytest.mark.parametrize('header', ['bytes=1024-', 'bytes=5-2', 'bytes=-0'])
+def test_unsatisfiable_ranges(server, header):
+    response, body = request(server, 'GET', AUDIO, Range=header)
+    assert response.status == 416
+    assert response.getheader('Content-Range') == f'bytes */{len(BODY)}'
+    assert body == b''
+
+
+def test_multiple_ranges_fall_back_to_the_whole_file(server):
+    response, body = request(server, 'GET', AUDIO, Range='bytes=0-1,5-6')
+    assert response.status == 200 and body == BODY
+
+
+def test_stale_if_range_gets_the_whole_file(server):
+    response, body = request(server, 'GET', AUDIO, Range='bytes=0-9', **{'If-Range': '"stale"'})
+    assert response.status == 200 and body == BODY
+
+
+def test_conditional_request_is_not_modified(server):
+    response, _ = request(server, 'GET', AUDIO)
+    response, body = request(server, 'GET', AUDIO, **{'If-None-Match': response.getheader('ETag')})
+    assert response.status == 304 and body == b''
+
+
+def test_head_range_does_not_leak_into_the_next_request(server):
+    response, _ = request(server, 'HEAD', AUDIO, Range='bytes=0-9')
+    assert response.status == 206
+    # Same keep-alive connection: a directory listing, then the full file
+    response, body = request(server, 'GET', '/deck/slideshow_audio/')
+    assert response.status == 200
+    assert len(body) == int(response.getheader('Content-Length'))
+    response, body = request(server, 'GET', AUDIO)
+    assert body == BODY
@@ -0,0 +1,72 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake monotonic clock that time.sleep() advances."""
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(rate_limiter.time, 'sleep', sleep)
+    return sleeps
+
+
+def test_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_acquire_spaces_requests_at_the_rate(clock):
+    limiter = RateLimiter(requests_per_minute=60)
+    for _ in range(4):
+        limiter.acquire()
+    # The first token is free, then one per second
+    assert clock == pytest.approx([1.0, 1.0, 1.0])
+
+
+def test_burst_allows_back_to_back_requests(clock):
+    limiter = RateLimiter(requests_per_minute=60, burst=3)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock == []
+
+
+def test_penalize_halves_rate_and_pauses(clock):
+    limiter = RateLimiter(requests_per_minute=40)
+    assert limiter.penalize(retry_after=5) == 5
+    assert limiter.rate == 20
+    limiter.acquire()
+    limiter.acquire()
+    # Paused for Retry-After, then one token per 3 seconds at the reduced rate
+    assert clock == pytest.approx([5.0, 3.0])
+
+
+def test_penalize_backs_off_exponentially_without_retry_after(clock):
+    limiter = RateLimiter(requests_per_minute=40)
+    assert [limiter.penalize() for _ in range(3)] == [2.0, 4.0, 8.0]
+
+
+def test_rate_never_drops_below_minimum(clock):
+    limiter = RateLimiter(requests_per_minute=8, min_rate=2)
+    for _ in range(5):
+        limiter.penalize(retry_after=0)
+    assert limiter.rate == 2
+
+
+def test_reward_recovers_additively_up_to_the_maximum(clock):
+    limiter = RateLimiter(requests_per_minute=100)
+    limiter.penalize(retry_after=0)
+    assert limiter.rate == 50
+    limiter.reward()
+    assert limiter.rate == 60
+    for _ in range(10):
+        limiter.reward()
+    assert limiter.rate == 100
@@ -0,0 +1,42 @@
+import json
+
+from search_index import deck_data, find_search_decks, index_deck, inline_data, tokenize, update_search_index
+
+
+def test_tokenize_drops_markup_stopwords_and_short_tokens():
+    assert tokenize('<b>The</b> deployment &amp; a rollout of CI_CD v2') == ['deployment', 'rollout', 'ci', 'cd', 'v2']
+
+
+def test_index_deck_weights_fields():
+    deck = {'metadata': {'title': 'Pilot'}, 'slides': [{'title': 'Pilot plan', 'script': 'pilot'}]}
+    index = index_deck(deck)
+    assert index['titles'] == ['Pilot', 'Pilot plan']
+    assert index['terms']['pilot'] == {0: 4, 1: 4}
+
+
+def test_inline_data_reads_plain_json_objects(tmp_path):
+    page = tmp_path / 'index.html'
+    page.write_text('<script>\n const slideshowData = {"title": "T", "slides": []};\n</script>')
+    assert inline_data(page) == '{"title": "T", "slides": []}'
+    page.write_text("<script>const slideshowData = {title: 'T'};</script>")
+    assert inline_data(page) is None
+
+
+def test_hand_built_decks_are_indexed_without_slide_links(tmp_path):
+    built = tmp_path / 'built'
+    built.mkdir()
+    (built / 'slideshow_data.json').write_text('{"metadata": {"title": "Built"}, "slides": []}')
+    hand = tmp_path / 'hand'
+    hand.mkdir()
+    (hand / 'index.html').write_text('const slideshowData = {"title": "Hand", "slides": [{"title": "One"}]};')
+    (tmp_path / 'empty').mkdir()
+
+    decks = find_search_decks(tmp_path)
+    assert [deck.name for deck in decks] == ['built', 'hand']
+    assert deck_data(hand).startswith(b'{"title": "Hand"')
+
+    update_search_index(decks, tmp_path / 'search', tmp_path / 'cache')
+    index = json.loads((tmp_path / 'search' / 'index.json').read_text())
+    assert [(d['name'], d['slideLinks']) for d in index['decks']] == [('built', True), ('hand', False)]
+    assert index['decks'][1]['titles'] == ['Hand', 'One']
+    assert 'and' in index['stopwords']
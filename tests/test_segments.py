@@ -0,0 +1,39 @@
+from segments import needs_segmenting, segment_script, split_sentences
+
+
+def test_split_sentences_keeps_punctuation_and_quotes():
+    text = 'It works. "Really?" she asked.  Then (quietly) we left! 3 more.'
+    assert split_sentences(text) == ['It works.', '"Really?" she asked.', 'Then (quietly) we left!', '3 more.']
+
+
+def test_split_sentences_ignores_lowercase_continuations():
+    assert split_sentences('Use e.g. this one. Next.') == ['Use e.g. this one.', 'Next.']
+
+
+def test_split_sentences_of_blank_text():
+    assert split_sentences('   ') == []
+    assert split_sentences(None) == []
+
+
+def test_short_sentences_are_joined():
+    text = 'Yes. No. This sentence is long enough to stand on its own today.'
+    assert segment_script(text, max_chars=100, min_chars=20) == [
+        'Yes. No. This sentence is long enough to stand on its own today.',
+    ]
+
+
+def test_short_tail_joins_the_previous_segment():
+    text = 'This first sentence is comfortably long enough. Bye.'
+    assert segment_script(text, max_chars=100, min_chars=20) == [text]
+
+
+def test_segments_never_exceed_max_chars():
+    text = ' '.join(['A sentence of a moderate length goes here.'] * 20) + ' ' + 'x' * 130
+    segments = segment_script(text, max_chars=100, min_chars=20)
+    assert all(len(segment) <= 100 for segment in segments)
+    assert ''.join(segments).replace(' ', '') == text.replace(' ', '')
+
+
+def test_needs_segmenting_ignores_whitespace():
+    assert not needs_segmenting('a  ' * 10, max_chars=20)
+    assert needs_segmenting('a ' * 11, max_chars=20)
@@ -0,0 +1,45 @@
+import io
+import json
+import os
+
+import pytest
+
+from template_engine import Template, json_for_script, load_template
+
+
+def test_render_substitutes_placeholders():
+    template = Template('<h1>{{TITLE}}</h1>{{ BODY }}!')
+    assert template.placeholders == {'TITLE', 'BODY'}
+    assert template.render({'TITLE': 'Hi', 'BODY': 'there'}) == '<h1>Hi</h1>there!'
+
+
+def test_lowercase_braces_are_literal():
+    assert Template('{{name}} {x}').render({}) == '{{name}} {x}'
+
+
+def test_values_may_be_chunk_iterables():
+    out = io.StringIO()
+    Template('[{{ITEMS}}]').render_to(out, {'ITEMS': (str(i) for i in range(3))})
+    assert out.getvalue() == '[012]'
+
+
+def test_missing_placeholder_raises():
+    with pytest.raises(KeyError):
+        Template('{{MISSING}}').render({})
+
+
+def test_load_template_recompiles_only_when_the_file_changes(tmp_path):
+    path = tmp_path / 'page.html'
+    path.write_text('a {{X}}')
+    first = load_template(path)
+    assert load_template(path) is first
+    path.write_text('bb {{X}}')
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1))
+    assert load_template(path).render({'X': 'c'}) == 'bb c'
+
+
+def test_json_for_script_cannot_close_the_script_element():
+    data = {'text': '</script><!-- x'}
+    encoded = ''.join(json_for_script(data))
+    assert '</' not in encoded and '<!--' not in encoded
+    assert json.loads(encoded) == data